@@ -0,0 +1,27 @@
+"""One-shot migration of string date fields to native BSON dates.
+
+Usage (from the backend directory):
+    python migrate_dates.py [--dry-run]
+"""
+import argparse
+import asyncio
+import json
+
+from server import client, migrate_date_fields
+
+
+async def main(dry_run: bool):
+    try:
+        report = await migrate_date_fields(dry_run=dry_run)
+    finally:
+        client.close()
+    print(json.dumps(report, indent=2))
+    if report["unparseable"]:
+        print(f"{len(report['unparseable'])} value(s) could not be parsed and were left unchanged")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert string date fields to BSON dates")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    args = parser.parse_args()
+    asyncio.run(main(args.dry_run))
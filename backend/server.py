@@ -1,17 +1,33 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Response, Request, Header
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from starlette.responses import StreamingResponse
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorGridFSBucket
+from pymongo import ReturnDocument, ReplaceOne, DeleteOne, UpdateOne, InsertOne, IndexModel
+from pymongo.errors import DuplicateKeyError, BulkWriteError
+from bson import json_util, ObjectId
 import os
+import asyncio
 import logging
 import base64
+import re
+import hashlib
+import zlib
+import io
+import tempfile
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Optional, Literal
+from pydantic import BaseModel, Field, BeforeValidator, PlainSerializer, ValidationError
+from typing import List, Optional, Literal, Annotated, Union
 import uuid
-from datetime import datetime, timezone
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone, timedelta
 from emergentintegrations.llm.chat import LlmChat, UserMessage
+from python_multipart.multipart import MultipartParser, parse_options_header
 import json
+import math
+import time
+import numpy as np
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -21,6 +37,11 @@ client = AsyncIOMotorClient(mongo_url)
 db = client['grantpilot_v2']
 
 EMERGENT_LLM_KEY = os.environ.get('EMERGENT_LLM_KEY', '')
+# OpenAI-compatible endpoint for streamed completions (the LLM key's proxy); see backend/.env
+LLM_API_BASE = os.environ.get('LLM_API_BASE', '')
+# Emergent universal keys only work through a proxy, so token streaming needs LLM_API_BASE unless
+# the key is a provider key; without it drafts are sent in one piece (warned at startup and per draft)
+LLM_DIRECT_STREAMING = bool(LLM_API_BASE) or not EMERGENT_LLM_KEY.startswith('sk-emergent-')
 
 app = FastAPI(title="GrantPilot - Grant Management for Small Nonprofits")
 api_router = APIRouter(prefix="/api")
@@ -30,34 +51,205 @@ logger = logging.getLogger(__name__)
 
 # Query limit - reasonable for small nonprofits (typically <50 grants)
 MAX_RESULTS = 200
+# Largest page a client may request from cursor-paginated list endpoints
+MAX_PAGE_SIZE = 500
+# Most operations accepted by one /api/batch request
+MAX_BATCH_OPERATIONS = 500
+# LLM response cache: in-process LRU entries, and lifetime of persisted entries
+LLM_CACHE_SIZE = int(os.environ.get('LLM_CACHE_SIZE', '256'))
+LLM_CACHE_TTL_SECONDS = int(os.environ.get('LLM_CACHE_TTL_SECONDS', str(7 * 24 * 3600)))
+# Outbound model calls, process-wide: sustained requests per minute, burst size, and calls in flight
+LLM_RATE_PER_MINUTE = float(os.environ.get('LLM_RATE_PER_MINUTE', '60'))
+LLM_RATE_BURST = int(os.environ.get('LLM_RATE_BURST', '10'))
+LLM_CONCURRENCY = int(os.environ.get('LLM_CONCURRENCY', '8'))
+# Most prompts accepted by one batch draft request
+MAX_DRAFT_BATCH = 20
+# Retrieved organisational context added to draft prompts, in approximate tokens (~4 characters each)
+DRAFT_CONTEXT_TOKENS = int(os.environ.get('DRAFT_CONTEXT_TOKENS', '1500'))
+# Background jobs: worker concurrency, retry policy, lease/poll timing, and how long finished jobs are kept
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', '3'))
+JOB_RETRY_BASE_SECONDS = 5
+JOB_LEASE_SECONDS = 60
+JOB_POLL_SECONDS = 5
+JOB_RETENTION_SECONDS = 7 * 24 * 3600
+# Award extraction: characters per document chunk, overlap carried between chunks, and concurrent LLM calls
+EXTRACT_CHUNK_CHARS = int(os.environ.get('EXTRACT_CHUNK_CHARS', '8000'))
+EXTRACT_CHUNK_OVERLAP = int(os.environ.get('EXTRACT_CHUNK_OVERLAP', '500'))
+EXTRACT_CONCURRENCY = int(os.environ.get('EXTRACT_CONCURRENCY', '4'))
+# An award document still marked as processing after this long is assumed abandoned and may be re-extracted
+AWARD_CLAIM_TIMEOUT_SECONDS = 10 * 60
+# Document parsing: worker processes for PDF/DOCX text extraction, and extracted texts kept in memory
+DOCUMENT_WORKERS = int(os.environ.get('DOCUMENT_WORKERS', str(os.cpu_count() or 2)))
+DOCUMENT_CACHE_SIZE = int(os.environ.get('DOCUMENT_CACHE_SIZE', '64'))
+# Multipart uploads: bytes held in memory before spooling to disk, and the largest file accepted
+UPLOAD_SPOOL_BYTES = 1024 * 1024
+MAX_UPLOAD_BYTES = int(os.environ.get('MAX_UPLOAD_BYTES', str(50 * 1024 * 1024)))
 
 # ============== DATABASE INDEXES ==============
+# Declared per collection so staged imports can build the same indexes before swapping in
+INDEXES = {
+    "grants": [
+        IndexModel("id", unique=True),
+        # Grant list filters (equality first) followed by the keyset sort keys
+        IndexModel([("stage", 1), ("_id", 1)]),
+        IndexModel([("stage", 1), ("deadline", 1), ("_id", 1)]),
+        IndexModel([("stage", 1), ("amount_requested", 1), ("_id", 1)]),
+        IndexModel([("funder_id", 1), ("_id", 1)]),
+        IndexModel([("funder_id", 1), ("deadline", 1), ("_id", 1)]),
+        IndexModel([("funder_id", 1), ("amount_requested", 1), ("_id", 1)]),
+        IndexModel([("program", 1), ("_id", 1)]),
+        IndexModel([("program", 1), ("deadline", 1), ("_id", 1)]),
+        IndexModel([("program", 1), ("amount_requested", 1), ("_id", 1)]),
+        IndexModel([("deadline", 1), ("_id", 1)]),
+        IndexModel([("amount_requested", 1), ("_id", 1)]),
+    ],
+    "funders": [IndexModel("id", unique=True), IndexModel("name")],
+    "content": [IndexModel("id", unique=True), IndexModel([("category", 1), ("_id", 1)])],
+    "reporting": [
+        IndexModel("id", unique=True),
+        IndexModel([("grant_id", 1), ("_id", 1)]),
+        IndexModel("due_date"),
+    ],
+    "compliance": [
+        IndexModel("id", unique=True),
+        IndexModel([("grant_id", 1), ("_id", 1)]),
+        IndexModel("deadline"),
+    ],
+    "budgets": [IndexModel("id", unique=True), IndexModel([("grant_id", 1), ("_id", 1)])],
+    "outcomes": [IndexModel("id", unique=True), IndexModel([("program", 1), ("_id", 1)])],
+    "dashboard_summary": [IndexModel("id", unique=True)],
+    "deadlines": [
+        IndexModel("id", unique=True),
+        IndexModel([("is_open", 1), ("date", 1)]),
+        IndexModel("grant_id"),
+    ],
+    "import_hashes": [IndexModel([("collection", 1), ("id", 1)], unique=True)],
+    "llm_cache": [
+        IndexModel("key", unique=True),
+        IndexModel("created_at", expireAfterSeconds=LLM_CACHE_TTL_SECONDS),
+    ],
+    "award_documents": [
+        IndexModel("id", unique=True),
+        IndexModel([("sha256", 1), ("grant_id", 1)], unique=True),
+        IndexModel("grant_id"),
+    ],
+    "jobs": [
+        IndexModel("id", unique=True),
+        IndexModel([("status", 1), ("run_at", 1)]),
+        IndexModel([("status", 1), ("lease_expires_at", 1)]),
+        IndexModel("finished_at", expireAfterSeconds=JOB_RETENTION_SECONDS),
+    ],
+}
+
 async def create_indexes():
     """Create indexes for common query patterns"""
+    for name, indexes in INDEXES.items():
+        try:
+            await db[name].create_indexes(indexes)
+        except Exception as e:
+            logger.warning(f"Index creation warning for {name} (may already exist): {e}")
+    logger.info("Database indexes created successfully")
+
+# Multi-document transactions need a replica set or sharded cluster; standalone servers reject them
+transactions_supported = False
+
+async def detect_transaction_support():
+    global transactions_supported
     try:
-        await db.grants.create_index("id", unique=True)
-        await db.grants.create_index("stage")
-        await db.grants.create_index("deadline")
-        await db.funders.create_index("id", unique=True)
-        await db.funders.create_index("name")
-        await db.content.create_index("id", unique=True)
-        await db.content.create_index("category")
-        await db.reporting.create_index("id", unique=True)
-        await db.reporting.create_index("grant_id")
-        await db.reporting.create_index("due_date")
-        await db.compliance.create_index("id", unique=True)
-        await db.compliance.create_index("grant_id")
-        await db.budgets.create_index("id", unique=True)
-        await db.budgets.create_index("grant_id")
-        await db.outcomes.create_index("id", unique=True)
-        await db.outcomes.create_index("program")
-        logger.info("Database indexes created successfully")
+        hello = await client.admin.command('hello')
+        transactions_supported = bool(hello.get('setName')) or hello.get('msg') == 'isdbgrid'
     except Exception as e:
-        logger.warning(f"Index creation warning (may already exist): {e}")
+        logger.warning(f"Could not detect transaction support: {e}")
 
 @app.on_event("startup")
 async def startup():
     await create_indexes()
+    await detect_transaction_support()
+    if not await db.dashboard_summary.find_one({"id": SUMMARY_ID}, {"_id": 1}):
+        await rebuild_dashboard_summary()
+    if not await db.deadlines.estimated_document_count():
+        await rebuild_deadlines()
+    await rebuild_search_index()
+    await rebuild_funder_matcher()
+    await recover_stale_jobs()
+    start_job_workers()
+    if not LLM_DIRECT_STREAMING:
+        logger.warning("LLM_API_BASE is not set: /api/ai/draft/stream will send each draft in one piece "
+                       "after the full completion. Set it to the LLM key's OpenAI-compatible proxy to stream tokens.")
+
+# ============== DATES ==============
+# Calendar dates (deadlines, due dates, grant periods) are stored as BSON dates at
+# midnight so range queries and indexes compare natively; the API keeps speaking YYYY-MM-DD.
+DATE_FIELDS = ('deadline', 'due_date', 'submitted_date', 'decision_date', 'grant_period_start', 'grant_period_end')
+DATE_COLLECTIONS = {
+    'grants': ['deadline', 'submitted_date', 'decision_date', 'grant_period_start', 'grant_period_end'],
+    'reporting': ['due_date', 'submitted_date'],
+    'compliance': ['deadline'],
+}
+DATE_FORMATS = ("%m/%d/%Y", "%B %d, %Y", "%b %d, %Y")
+
+def parse_date(value) -> Optional[datetime]:
+    """Parse a calendar date; empty values become None, anything unrecognised raises ValueError"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return datetime(value.year, value.month, value.day)
+    if not isinstance(value, str):
+        raise ValueError(f"Invalid date: {value!r}")
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if parsed.tzinfo:
+            parsed = parsed.astimezone(timezone.utc)
+        return datetime(parsed.year, parsed.month, parsed.day)
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date: {value!r}")
+
+def coerce_date(value) -> Optional[datetime]:
+    """parse_date() for untrusted input (AI output, legacy rows): unparseable becomes None"""
+    try:
+        return parse_date(value)
+    except ValueError:
+        return None
+
+def format_date(value) -> str:
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d")
+    return value or ""
+
+def dates_to_db(doc: dict) -> dict:
+    """Convert date fields of a raw document for storage, leaving unparseable strings for the migration report"""
+    for field in DATE_FIELDS:
+        if field in doc:
+            try:
+                doc[field] = parse_date(doc[field])
+            except ValueError:
+                pass
+    return doc
+
+def dates_to_api(doc: Optional[dict]) -> Optional[dict]:
+    if doc:
+        for field in DATE_FIELDS:
+            if field in doc:
+                doc[field] = format_date(doc[field])
+    return doc
+
+def parse_date_param(value: Optional[str], name: str) -> Optional[datetime]:
+    try:
+        return parse_date(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name} date: {value}")
+
+DateField = Annotated[Optional[datetime], BeforeValidator(parse_date), PlainSerializer(format_date, when_used='json')]
 
 # ============== MODELS ==============
 
@@ -69,6 +261,7 @@ class ContentItem(BaseModel):
     content: str
     tags: List[str] = []
     updated_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    version: int = 1
 
 class ContentItemCreate(BaseModel):
     category: Literal['mission', 'history', 'leadership', 'programs', 'financials', 'boilerplate', 'other']
@@ -91,6 +284,7 @@ class FunderProfile(BaseModel):
     contact_email: str = ""
     relationship_notes: str = ""
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    version: int = 1
 
 class FunderProfileCreate(BaseModel):
     name: str
@@ -114,14 +308,15 @@ class Grant(BaseModel):
     amount_requested: float = Field(default=0, ge=0)
     amount_awarded: float = Field(default=0, ge=0)
     stage: Literal['researching', 'writing', 'submitted', 'pending', 'awarded', 'declined', 'closed'] = 'researching'
-    deadline: str = ""
-    submitted_date: str = ""
-    decision_date: str = ""
-    grant_period_start: str = ""
-    grant_period_end: str = ""
+    deadline: DateField = None
+    submitted_date: DateField = None
+    decision_date: DateField = None
+    grant_period_start: DateField = None
+    grant_period_end: DateField = None
     program: str = Field(default="", max_length=200)
     notes: str = Field(default="", max_length=5000)
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    version: int = 1
 
 
 class GrantCreate(BaseModel):
@@ -130,7 +325,7 @@ class GrantCreate(BaseModel):
     funder_name: str = ""
     amount_requested: float = 0
     stage: Literal['researching', 'writing', 'submitted', 'pending', 'awarded', 'declined', 'closed'] = 'researching'
-    deadline: str = ""
+    deadline: DateField = None
     program: str = ""
     notes: str = ""
 
@@ -141,11 +336,11 @@ class GrantUpdate(BaseModel):
     amount_requested: Optional[float] = None
     amount_awarded: Optional[float] = None
     stage: Optional[Literal['researching', 'writing', 'submitted', 'pending', 'awarded', 'declined', 'closed']] = None
-    deadline: Optional[str] = None
-    submitted_date: Optional[str] = None
-    decision_date: Optional[str] = None
-    grant_period_start: Optional[str] = None
-    grant_period_end: Optional[str] = None
+    deadline: DateField = None
+    submitted_date: DateField = None
+    decision_date: DateField = None
+    grant_period_start: DateField = None
+    grant_period_end: DateField = None
     program: Optional[str] = None
     notes: Optional[str] = None
 
@@ -156,18 +351,19 @@ class ReportingRequirement(BaseModel):
     report_type: Literal['financial', 'narrative', 'progress', 'final', 'audit', 'other']
     title: str
     description: str = ""
-    due_date: str
+    due_date: DateField
     frequency: Literal['one-time', 'monthly', 'quarterly', 'semi-annual', 'annual'] = 'one-time'
     status: Literal['upcoming', 'in-progress', 'submitted', 'approved'] = 'upcoming'
-    submitted_date: str = ""
+    submitted_date: DateField = None
     notes: str = ""
+    version: int = 1
 
 class ReportingRequirementCreate(BaseModel):
     grant_id: str
     report_type: Literal['financial', 'narrative', 'progress', 'final', 'audit', 'other']
     title: str
     description: str = ""
-    due_date: str
+    due_date: DateField
     frequency: Literal['one-time', 'monthly', 'quarterly', 'semi-annual', 'annual'] = 'one-time'
     notes: str = ""
 
@@ -176,15 +372,16 @@ class ComplianceItem(BaseModel):
     grant_id: str
     requirement: str
     category: Literal['spending', 'documentation', 'programmatic', 'audit', 'other'] = 'other'
-    deadline: str = ""
+    deadline: DateField = None
     is_completed: bool = False
     notes: str = ""
+    version: int = 1
 
 class ComplianceItemCreate(BaseModel):
     grant_id: str
     requirement: str
     category: Literal['spending', 'documentation', 'programmatic', 'audit', 'other'] = 'other'
-    deadline: str = ""
+    deadline: DateField = None
     notes: str = ""
 
 # Budget Builder
@@ -195,6 +392,7 @@ class BudgetTemplate(BaseModel):
     line_items: List[dict] = []  # {category, description, amount, notes}
     total: float = 0
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    version: int = 1
 
 class BudgetTemplateCreate(BaseModel):
     name: str
@@ -212,6 +410,7 @@ class OutcomeMetric(BaseModel):
     source: str = ""
     notes: str = ""
     updated_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    version: int = 1
 
 class OutcomeMetricCreate(BaseModel):
     program: str
@@ -232,33 +431,1001 @@ class OrgSettings(BaseModel):
     primary_email: str = ""
 
 # ============== AI HELPER ==============
-
-async def call_gemini(prompt: str, system_msg: str = "") -> str:
+LLM_PROVIDER = "gemini"
+LLM_MODEL = "gemini-2.5-flash"
+DEFAULT_SYSTEM_MSG = "You are a grant management assistant for small nonprofits."
+JSON_SYSTEM_MSG = "You extract structured data from documents. Always respond with valid JSON only, no markdown code blocks."
+
+# Responses are cached by a hash of (model, system message, prompt): a small in-process
+# LRU in front of the llm_cache collection, whose TTL index expires old entries.
+llm_cache = OrderedDict()
+llm_cache_stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "bypassed": 0}
+
+def llm_cache_key(system_msg: str, prompt: str) -> str:
+    payload = json.dumps([f"{LLM_PROVIDER}/{LLM_MODEL}", system_msg, prompt])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def remember_llm_response(key: str, response: str):
+    llm_cache[key] = response
+    llm_cache.move_to_end(key)
+    while len(llm_cache) > LLM_CACHE_SIZE:
+        llm_cache.popitem(last=False)
+
+async def cached_llm_response(key: str) -> Optional[str]:
+    if key in llm_cache:
+        llm_cache.move_to_end(key)
+        llm_cache_stats["memory_hits"] += 1
+        return llm_cache[key]
+    try:
+        cached = await db.llm_cache.find_one({"key": key}, {"_id": 0, "response": 1})
+    except Exception as e:
+        logger.warning(f"LLM cache read failed: {e}")
+        cached = None
+    if cached:
+        llm_cache_stats["db_hits"] += 1
+        remember_llm_response(key, cached["response"])
+        return cached["response"]
+    llm_cache_stats["misses"] += 1
+    return None
+
+async def store_llm_response(key: str, response: str):
+    remember_llm_response(key, response)
+    try:
+        await db.llm_cache.update_one(
+            {"key": key},
+            {"$set": {"key": key, "model": LLM_MODEL, "response": response, "created_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+    except Exception as e:
+        logger.warning(f"LLM cache write failed: {e}")
+
+# Every model call takes a concurrency slot, then a token from a bucket refilled at LLM_RATE_PER_MINUTE
+llm_semaphore = asyncio.Semaphore(LLM_CONCURRENCY)
+llm_bucket = {"tokens": float(LLM_RATE_BURST), "updated": time.monotonic()}
+llm_bucket_lock = asyncio.Lock()
+
+async def take_llm_token():
+    async with llm_bucket_lock:
+        while True:
+            now = time.monotonic()
+            refill = (now - llm_bucket["updated"]) * LLM_RATE_PER_MINUTE / 60
+            llm_bucket["tokens"] = min(float(LLM_RATE_BURST), llm_bucket["tokens"] + refill)
+            llm_bucket["updated"] = now
+            if llm_bucket["tokens"] >= 1:
+                llm_bucket["tokens"] -= 1
+                return
+            await asyncio.sleep((1 - llm_bucket["tokens"]) * 60 / LLM_RATE_PER_MINUTE)
+
+async def send_llm_message(prompt: str, system_msg: str) -> str:
+    async with llm_semaphore:
+        await take_llm_token()
+        return await request_llm_message(prompt, system_msg)
+
+async def request_llm_message(prompt: str, system_msg: str) -> str:
     try:
         chat = LlmChat(
             api_key=EMERGENT_LLM_KEY,
             session_id=str(uuid.uuid4()),
-            system_message=system_msg or "You are a grant management assistant for small nonprofits."
-        ).with_model("gemini", "gemini-2.5-flash")
-        response = await chat.send_message(UserMessage(text=prompt))
-        return response
+            system_message=system_msg
+        ).with_model(LLM_PROVIDER, LLM_MODEL)
+        return await chat.send_message(UserMessage(text=prompt))
     except Exception as e:
         logger.error(f"AI error: {e}")
         raise HTTPException(status_code=500, detail=f"AI service error: {str(e)}")
 
-async def call_gemini_json(prompt: str) -> dict:
+async def stream_llm_message(prompt: str, system_msg: str):
+    """Yield response text as the model produces it
+
+    LlmChat only returns whole responses, so streaming goes through litellm directly. Without a
+    streaming endpoint, or if the stream fails before its first chunk, the complete response is
+    fetched and yielded as one piece.
+    """
+    async with llm_semaphore:
+        await take_llm_token()
+        async for text in request_llm_stream(prompt, system_msg):
+            yield text
+
+async def request_llm_stream(prompt: str, system_msg: str):
+    if not LLM_DIRECT_STREAMING:
+        logger.warning("AI streaming not configured (LLM_API_BASE unset), sending the draft as a single response")
+        yield await request_llm_message(prompt, system_msg)
+        return
+    started = False
     try:
-        response = await call_gemini(prompt, "You extract structured data from documents. Always respond with valid JSON only, no markdown code blocks.")
-        cleaned = response.strip()
-        if cleaned.startswith("```json"):
-            cleaned = cleaned[7:]
-        if cleaned.startswith("```"):
-            cleaned = cleaned[3:]
-        if cleaned.endswith("```"):
-            cleaned = cleaned[:-3]
-        return json.loads(cleaned.strip())
+        import litellm
+        stream = await litellm.acompletion(
+            model=f"{LLM_PROVIDER}/{LLM_MODEL}",
+            messages=[{"role": "system", "content": system_msg}, {"role": "user", "content": prompt}],
+            api_key=EMERGENT_LLM_KEY,
+            api_base=LLM_API_BASE or None,
+            stream=True
+        )
+        # Providers may only connect on the first chunk, so failures up to then still fall back
+        async for chunk in stream:
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            if text:
+                started = True
+                yield text
+    except Exception as e:
+        if started:
+            raise
+        logger.warning(f"AI streaming unavailable, falling back to a single response: {e}")
+        yield await request_llm_message(prompt, system_msg)
+
+async def call_gemini(prompt: str, system_msg: str = "", cache: bool = True) -> str:
+    system_msg = system_msg or DEFAULT_SYSTEM_MSG
+    key = llm_cache_key(system_msg, prompt) if cache else None
+    if key:
+        cached = await cached_llm_response(key)
+        if cached is not None:
+            return cached
+    else:
+        llm_cache_stats["bypassed"] += 1
+    response = await send_llm_message(prompt, system_msg)
+    if key:
+        await store_llm_response(key, response)
+    return response
+
+def parse_json_response(response: str) -> dict:
+    cleaned = response.strip()
+    if cleaned.startswith("```json"):
+        cleaned = cleaned[7:]
+    if cleaned.startswith("```"):
+        cleaned = cleaned[3:]
+    if cleaned.endswith("```"):
+        cleaned = cleaned[:-3]
+    return json.loads(cleaned.strip())
+
+async def call_gemini_json(prompt: str, cache: bool = True) -> dict:
+    # Only responses that parse are cached, so a malformed answer is retried next time
+    key = llm_cache_key(JSON_SYSTEM_MSG, prompt) if cache else None
+    if key:
+        cached = await cached_llm_response(key)
+        if cached is not None:
+            try:
+                return parse_json_response(cached)
+            except json.JSONDecodeError:
+                pass
+    else:
+        llm_cache_stats["bypassed"] += 1
+    try:
+        response = await send_llm_message(prompt, JSON_SYSTEM_MSG)
+        result = parse_json_response(response)
     except json.JSONDecodeError:
         return {}
+    if key:
+        await store_llm_response(key, response)
+    return result
+
+# ============== DOCUMENT TEXT ==============
+DOCX_MIME_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+document_pool: Optional[ProcessPoolExecutor] = None
+document_texts = OrderedDict()
+
+def document_kind(mime_type: str, filename: str = "") -> str:
+    name = (filename or "").lower()
+    if 'pdf' in (mime_type or "") or name.endswith('.pdf'):
+        return 'pdf'
+    if mime_type == DOCX_MIME_TYPE or name.endswith('.docx'):
+        return 'docx'
+    return 'text'
+
+def parse_document(source: Union[bytes, str], kind: str) -> str:
+    """Extract plain text from PDF or DOCX bytes or a file path; runs in a worker process"""
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    if kind == 'pdf':
+        from pypdf import PdfReader
+        return "\n\n".join(page.extract_text() or "" for page in PdfReader(source).pages)
+    if kind == 'docx':
+        import docx
+        document = docx.Document(source)
+        blocks = [p.text for p in document.paragraphs]
+        for table in document.tables:
+            for row in table.rows:
+                blocks.append(" | ".join(cell.text for cell in row.cells))
+        return "\n\n".join(b for b in blocks if b.strip())
+    raise ValueError(f"Unsupported document type: {kind}")
+
+def get_document_pool() -> ProcessPoolExecutor:
+    global document_pool
+    if document_pool is None:
+        document_pool = ProcessPoolExecutor(max_workers=DOCUMENT_WORKERS)
+    return document_pool
+
+async def extract_document_text(data: Union[bytes, str], mime_type: str, filename: str = "", digest: Optional[str] = None) -> str:
+    """Return the text of an uploaded document, parsing PDF/DOCX off the event loop and caching by content hash
+
+    `data` is the document bytes, or the path of an upload spooled to disk; workers open paths
+    themselves so large files are never copied through this process.
+    """
+    kind = document_kind(mime_type, filename)
+    if kind == 'text':
+        if isinstance(data, str):
+            with open(data, 'rb') as file:
+                data = file.read()
+        return data.decode('utf-8', errors='ignore')
+
+    key = digest or hashlib.sha256(data).hexdigest()
+    if key in document_texts:
+        document_texts.move_to_end(key)
+        return document_texts[key]
+    try:
+        text = await asyncio.get_running_loop().run_in_executor(get_document_pool(), parse_document, data, kind)
+    except ImportError as e:
+        raise HTTPException(status_code=501, detail=f"{kind.upper()} support is not installed ({e.name})")
+    except Exception as e:
+        logger.error(f"Document parsing error: {e}")
+        raise HTTPException(status_code=422, detail=f"Could not read {kind.upper()} document")
+    document_texts[key] = text
+    while len(document_texts) > DOCUMENT_CACHE_SIZE:
+        document_texts.popitem(last=False)
+    return text
+
+# ----- Multipart Uploads -----
+async def receive_upload(request: Request) -> dict:
+    """Stream a multipart/form-data body into memory, or a named temp file once it outgrows
+    UPLOAD_SPOOL_BYTES, hashing the file part as it arrives"""
+    content_type, params = parse_options_header(request.headers.get('content-type', ''))
+    if content_type != b'multipart/form-data' or b'boundary' not in params:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+
+    upload = {"fields": {}, "file": None, "filename": "", "content_type": "", "sha256": "", "size": 0}
+    sha = hashlib.sha256()
+    part = {}
+
+    def on_part_begin():
+        part.clear()
+        part.update(headers={}, field=b"", value=b"", data=bytearray(), is_file=False)
+
+    def on_header_field(data, start, end):
+        part['field'] += data[start:end]
+
+    def on_header_value(data, start, end):
+        part['value'] += data[start:end]
+
+    def on_header_end():
+        part['headers'][part['field'].lower()] = part['value']
+        part['field'], part['value'] = b"", b""
+
+    def on_headers_finished():
+        _, options = parse_options_header(part['headers'].get(b'content-disposition', b''))
+        part['name'] = options.get(b'name', b'').decode('utf-8', errors='ignore')
+        if b'filename' in options:
+            if upload['file'] is not None:
+                raise HTTPException(status_code=400, detail="Only one file may be uploaded")
+            part['is_file'] = True
+            upload['file'] = io.BytesIO()
+            upload['filename'] = options[b'filename'].decode('utf-8', errors='ignore')
+            upload['content_type'] = part['headers'].get(b'content-type', b'').decode('latin-1')
+
+    def on_part_data(data, start, end):
+        chunk = data[start:end]
+        if part['is_file']:
+            upload['size'] += len(chunk)
+            if upload['size'] > MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail=f"File exceeds {MAX_UPLOAD_BYTES} bytes")
+            sha.update(chunk)
+            if isinstance(upload['file'], io.BytesIO) and upload['size'] > UPLOAD_SPOOL_BYTES:
+                spooled = tempfile.NamedTemporaryFile(prefix='upload-')
+                spooled.write(upload['file'].getbuffer())
+                upload['file'] = spooled
+            upload['file'].write(chunk)
+        else:
+            part['data'] += chunk
+            if len(part['data']) > UPLOAD_SPOOL_BYTES:
+                raise HTTPException(status_code=413, detail="Form field too large")
+
+    def on_part_end():
+        if not part['is_file']:
+            upload['fields'][part['name']] = part['data'].decode('utf-8', errors='ignore')
+
+    parser = MultipartParser(params[b'boundary'], {
+        'on_part_begin': on_part_begin,
+        'on_header_field': on_header_field,
+        'on_header_value': on_header_value,
+        'on_header_end': on_header_end,
+        'on_headers_finished': on_headers_finished,
+        'on_part_data': on_part_data,
+        'on_part_end': on_part_end,
+    })
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+        parser.finalize()
+    except Exception as e:
+        if upload['file'] is not None:
+            upload['file'].close()
+        if isinstance(e, HTTPException):
+            raise
+        raise HTTPException(status_code=400, detail=f"Malformed multipart body: {e}")
+
+    if upload['file'] is None or not upload['size']:
+        if upload['file'] is not None:
+            upload['file'].close()
+        raise HTTPException(status_code=400, detail="No file uploaded")
+    upload['sha256'] = sha.hexdigest()
+    return upload
+
+def upload_source(upload: dict) -> Union[bytes, str]:
+    """The uploaded bytes while small, otherwise the path of the temp file they were spooled to"""
+    file = upload['file']
+    if isinstance(file, io.BytesIO):
+        return file.getvalue()
+    file.flush()
+    return file.name
+
+# ============== BACKGROUND JOBS ==============
+# Long-running work (award extraction) is queued in the `jobs` collection and processed by a
+# bounded pool of asyncio workers. Workers claim jobs atomically and hold a lease they keep
+# renewing; jobs whose lease lapses (crashed/restarted worker) are re-queued or failed.
+JOB_HANDLERS = {}
+# Per job type: called with the payload once a job is done or has failed for good
+JOB_CLEANUP = {}
+job_wakeup = asyncio.Event()
+job_tasks: List[asyncio.Task] = []
+
+async def enqueue_job(job_type: str, payload: dict, max_attempts: int = JOB_MAX_ATTEMPTS) -> dict:
+    now = datetime.now(timezone.utc)
+    job = {
+        "id": str(uuid.uuid4()),
+        "type": job_type,
+        "status": "queued",
+        "payload": payload,
+        "attempts": 0,
+        "max_attempts": max_attempts,
+        "progress": 0,
+        "message": "",
+        "error": None,
+        "result": None,
+        "run_at": now,
+        "created_at": now,
+        "updated_at": now,
+    }
+    await db.jobs.insert_one(job)
+    job_wakeup.set()
+    job.pop('_id', None)
+    return job
+
+async def claim_job(worker_id: str) -> Optional[dict]:
+    now = datetime.now(timezone.utc)
+    return await db.jobs.find_one_and_update(
+        {"status": "queued", "run_at": {"$lte": now}},
+        {
+            "$set": {
+                "status": "running",
+                "worker": worker_id,
+                "started_at": now,
+                "updated_at": now,
+                "lease_expires_at": now + timedelta(seconds=JOB_LEASE_SECONDS),
+            },
+            "$inc": {"attempts": 1},
+        },
+        sort=[("run_at", 1)],
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+
+async def cleanup_job(job: dict):
+    cleanup = JOB_CLEANUP.get(job['type'])
+    if cleanup and job.get('payload'):
+        try:
+            await cleanup(job['payload'])
+        except Exception as e:
+            logger.warning(f"Job {job['id']} cleanup failed: {e}")
+
+async def run_job(job: dict, worker_id: str):
+    owned = {"id": job['id'], "worker": worker_id, "status": "running"}
+
+    async def progress(percent: int, message: str = ""):
+        await db.jobs.update_one(owned, {"$set": {
+            "progress": percent, "message": message, "updated_at": datetime.now(timezone.utc)
+        }})
+
+    async def heartbeat():
+        while True:
+            await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+            await db.jobs.update_one(owned, {"$set": {
+                "lease_expires_at": datetime.now(timezone.utc) + timedelta(seconds=JOB_LEASE_SECONDS)
+            }})
+
+    beat = asyncio.create_task(heartbeat())
+    try:
+        handler = JOB_HANDLERS.get(job['type'])
+        if not handler:
+            raise ValueError(f"Unknown job type: {job['type']}")
+        result = await handler(job['payload'], progress)
+    except Exception as e:
+        error = e.detail if isinstance(e, HTTPException) else str(e)
+        now = datetime.now(timezone.utc)
+        logger.warning(f"Job {job['id']} attempt {job['attempts']} failed: {error}")
+        # Client errors (bad input, conflicts, missing support) fail the same way on every attempt
+        retryable = not (isinstance(e, HTTPException) and 400 <= e.status_code < 500 and e.status_code not in (408, 429))
+        if retryable and job['attempts'] < job['max_attempts']:
+            retry_at = now + timedelta(seconds=JOB_RETRY_BASE_SECONDS * 2 ** (job['attempts'] - 1))
+            await db.jobs.update_one(owned, {"$set": {
+                "status": "queued", "error": error, "run_at": retry_at, "updated_at": now
+            }})
+        else:
+            await db.jobs.update_one(owned, {
+                "$set": {"status": "failed", "error": error, "finished_at": now, "updated_at": now},
+                "$unset": {"payload": ""}
+            })
+            await cleanup_job(job)
+        return
+    finally:
+        beat.cancel()
+
+    now = datetime.now(timezone.utc)
+    await db.jobs.update_one(owned, {
+        "$set": {"status": "done", "progress": 100, "result": result, "error": None, "finished_at": now, "updated_at": now},
+        "$unset": {"payload": ""}
+    })
+    await cleanup_job(job)
+
+async def recover_stale_jobs():
+    """Re-queue (or fail, when out of attempts) running jobs whose worker lease has expired"""
+    now = datetime.now(timezone.utc)
+    stale = {"status": "running", "lease_expires_at": {"$lt": now}}
+    requeued = await db.jobs.update_many(
+        {**stale, "$expr": {"$lt": ["$attempts", "$max_attempts"]}},
+        {"$set": {"status": "queued", "run_at": now, "error": "Worker lease expired", "updated_at": now}}
+    )
+    exhausted = {**stale, "$expr": {"$gte": ["$attempts", "$max_attempts"]}}
+    failing = await db.jobs.find(exhausted, {"_id": 0, "id": 1, "type": 1, "payload": 1}).to_list(None)
+    failed = await db.jobs.update_many(
+        exhausted,
+        {
+            "$set": {"status": "failed", "error": "Worker lease expired", "finished_at": now, "updated_at": now},
+            "$unset": {"payload": ""}
+        }
+    )
+    for job in failing:
+        await cleanup_job(job)
+    if requeued.modified_count or failed.modified_count:
+        logger.info(f"Recovered stale jobs: {requeued.modified_count} re-queued, {failed.modified_count} failed")
+        job_wakeup.set()
+
+async def job_worker(worker_id: str):
+    while True:
+        try:
+            job_wakeup.clear()
+            job = await claim_job(worker_id)
+            if job:
+                await run_job(job, worker_id)
+                continue
+            try:
+                await asyncio.wait_for(job_wakeup.wait(), timeout=JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Job worker {worker_id} error: {e}")
+            await asyncio.sleep(JOB_POLL_SECONDS)
+
+async def job_reaper():
+    while True:
+        try:
+            await recover_stale_jobs()
+        except Exception as e:
+            logger.error(f"Job recovery error: {e}")
+        await asyncio.sleep(JOB_LEASE_SECONDS)
+
+def start_job_workers():
+    instance = uuid.uuid4().hex[:8]
+    job_tasks.append(asyncio.create_task(job_reaper()))
+    for i in range(JOB_WORKERS):
+        job_tasks.append(asyncio.create_task(job_worker(f"{instance}-{i}")))
+    logger.info(f"Started {JOB_WORKERS} job workers")
+
+async def stop_job_workers():
+    for task in job_tasks:
+        task.cancel()
+    await asyncio.gather(*job_tasks, return_exceptions=True)
+    job_tasks.clear()
+
+# ============== TEXT INDEX ==============
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in into is it its of on or our that the their "
+    "this to was we were will with".split()
+)
+
+def tokenize(text) -> List[str]:
+    """Lowercase word tokens without stopwords, with a light plural strip ("funders" -> "funder")"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(str(text or "").lower()):
+        if len(token) < 2 or token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+class TextIndex:
+    """In-process BM25 index over documents from several collections, kept current as documents are written
+
+    Postings are held per term and turned into NumPy arrays on first use, so a query only
+    touches the documents that contain its terms.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1, self.b = k1, b
+        self.slots = {}                                 # (collection, id) -> slot
+        self.keys = []                                  # slot -> (collection, id), None once removed
+        self.doc_terms = []                             # slot -> {term: weighted frequency}
+        self.lengths = np.zeros(64, dtype=np.float32)
+        self.groups = np.full(64, -1, dtype=np.int16)   # slot -> collection code, -1 when free
+        self.group_codes = {}
+        self.postings = {}                              # term -> {slot: weighted frequency}
+        self.arrays = {}                                # term -> (slots, frequencies), rebuilt after changes
+        self.free = []
+        self.total_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def clear(self):
+        self.__init__(self.k1, self.b)
+
+    def put(self, collection: str, doc_id: str, terms: dict):
+        """Add or replace a document given its weighted term frequencies"""
+        self.remove(collection, doc_id)
+        if not terms:
+            return
+        if self.free:
+            slot = self.free.pop()
+        else:
+            slot = len(self.keys)
+            self.keys.append(None)
+            self.doc_terms.append(None)
+            if slot >= len(self.lengths):
+                self.lengths = np.concatenate([self.lengths, np.zeros_like(self.lengths)])
+                self.groups = np.concatenate([self.groups, np.full_like(self.groups, -1)])
+        self.slots[(collection, doc_id)] = slot
+        self.keys[slot] = (collection, doc_id)
+        self.doc_terms[slot] = terms
+        self.groups[slot] = self.group_codes.setdefault(collection, len(self.group_codes))
+        self.lengths[slot] = sum(terms.values())
+        self.total_length += self.lengths[slot]
+        for term, frequency in terms.items():
+            self.postings.setdefault(term, {})[slot] = frequency
+            self.arrays.pop(term, None)
+
+    def remove(self, collection: str, doc_id: str):
+        slot = self.slots.pop((collection, doc_id), None)
+        if slot is None:
+            return
+        for term in self.doc_terms[slot]:
+            postings = self.postings[term]
+            del postings[slot]
+            if not postings:
+                del self.postings[term]
+            self.arrays.pop(term, None)
+        self.total_length -= self.lengths[slot]
+        self.keys[slot] = self.doc_terms[slot] = None
+        self.lengths[slot] = 0
+        self.groups[slot] = -1
+        self.free.append(slot)
+
+    def term_arrays(self, term: str) -> tuple:
+        if term not in self.arrays:
+            postings = self.postings.get(term, {})
+            self.arrays[term] = (
+                np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                np.fromiter(postings.values(), dtype=np.float32, count=len(postings))
+            )
+        return self.arrays[term]
+
+    def search(self, query: str, collections: Optional[List[str]] = None, limit: Optional[int] = None) -> List[tuple]:
+        """Rank matching documents as [((collection, id), score)], best first, keeping the top `limit`"""
+        if not self.slots:
+            return []
+        size = len(self.keys)
+        scores = np.zeros(size, dtype=np.float32)
+        lengths = self.lengths[:size]
+        avg_length = self.total_length / len(self.slots) or 1.0
+        count = len(self.slots)
+        query_terms = {}
+        for term in tokenize(query):
+            query_terms[term] = query_terms.get(term, 0) + 1
+        for term, query_frequency in query_terms.items():
+            slots, frequencies = self.term_arrays(term)
+            if not len(slots):
+                continue
+            idf = math.log(1 + (count - len(slots) + 0.5) / (len(slots) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * lengths[slots] / avg_length)
+            scores[slots] += query_frequency * idf * frequencies * (self.k1 + 1) / (frequencies + norm)
+        if collections is not None:
+            codes = [self.group_codes[c] for c in collections if c in self.group_codes]
+            scores[~np.isin(self.groups[:size], codes)] = 0
+        matches = np.flatnonzero(scores > 0)
+        if limit is not None and len(matches) > limit:
+            matches = matches[np.argpartition(-scores[matches], limit - 1)[:limit]]
+        ranked = matches[np.argsort(-scores[matches], kind='stable')]
+        return [(self.keys[slot], float(scores[slot])) for slot in ranked]
+
+# Indexed text per collection, with a weight applied to each field's term counts
+SEARCH_FIELDS = {
+    "grants": {"title": 3, "program": 1, "notes": 1},
+    "funders": {"name": 3, "priorities": 2, "restrictions": 1},
+    "content": {"title": 3, "tags": 2, "content": 1},
+    "outcomes": {"title": 3, "program": 1, "value": 1, "notes": 1},
+}
+# Field shown as each search result's title
+SEARCH_TITLES = {"grants": "title", "funders": "name", "content": "title", "outcomes": "title"}
+
+search_index = TextIndex()
+
+def best_passage(text: str, query_terms: set, max_chars: int) -> str:
+    """The paragraph of `text` sharing the most terms with the query, trimmed to max_chars"""
+    paragraphs = [p.strip() for p in re.split(r'\n\s*\n', text or "") if p.strip()]
+    if not paragraphs:
+        return ""
+    best = max(paragraphs, key=lambda p: len(query_terms & set(tokenize(p))))
+    return best if len(best) <= max_chars else best[:max_chars].rsplit(' ', 1)[0] + "..."
+
+def index_document(collection: str, doc: Optional[dict]):
+    """Refresh one document in the search index from its stored fields"""
+    if not doc or collection not in SEARCH_FIELDS:
+        return
+    terms = {}
+    for field, weight in SEARCH_FIELDS[collection].items():
+        value = doc.get(field)
+        text = " ".join(value) if isinstance(value, list) else value
+        for term in tokenize(text):
+            terms[term] = terms.get(term, 0) + weight
+    search_index.put(collection, doc['id'], terms)
+
+def unindex_document(collection: str, doc_id: str):
+    search_index.remove(collection, doc_id)
+
+async def rebuild_search_index() -> int:
+    """Load every searchable collection into the in-process index"""
+    search_index.clear()
+    for collection, fields in SEARCH_FIELDS.items():
+        projection = {"_id": 0, "id": 1, **{field: 1 for field in fields}}
+        async for doc in db[collection].find({}, projection):
+            index_document(collection, doc)
+    logger.info(f"Search index built with {len(search_index)} documents")
+    return len(search_index)
+
+# ============== FUNDER MATCHING ==============
+AMOUNT_PATTERN = re.compile(r'(\$)?\s*(\d[\d,]*(?:\.\d+)?)\s*(k|m|thousand|million)?\b')
+# Qualifiers that turn a single amount into an upper or lower bound
+UPPER_BOUND_PATTERN = re.compile(r'\b(up to|under|below|less than|no more than|max(imum)?)\b')
+LOWER_BOUND_PATTERN = re.compile(r'\b(over|above|at least|more than|min(imum)?)\b')
+# Weights of the score components: priority similarity, award range fit, and restriction similarity (a penalty)
+MATCH_WEIGHTS = {"priorities": 0.7, "amount": 0.3, "restrictions": 0.3}
+
+def parse_award_range(text) -> tuple:
+    """Numeric (low, high) bounds from text like "$10,000 - $50,000", "$25K-$100K" or "up to $1M"; NaN when unknown"""
+    text = str(text or "").lower()
+    amounts = []
+    for dollar, number, unit in AMOUNT_PATTERN.findall(text):
+        value = float(number.replace(',', ''))
+        if unit in ('k', 'thousand'):
+            value *= 1e3
+        elif unit in ('m', 'million'):
+            value *= 1e6
+        elif not dollar and (value < 1000 or 1900 <= value <= 2100):
+            # Bare small numbers and years are not amounts
+            continue
+        amounts.append(value)
+    if not amounts:
+        return (math.nan, math.nan)
+    if len(amounts) == 1:
+        if UPPER_BOUND_PATTERN.search(text):
+            return (0.0, amounts[0])
+        if '+' in text or LOWER_BOUND_PATTERN.search(text):
+            return (amounts[0], math.inf)
+        return (amounts[0], amounts[0])
+    return (min(amounts), max(amounts))
+
+def amount_fit(amount: float, lows: np.ndarray, highs: np.ndarray) -> np.ndarray:
+    """1.0 inside a funder's range, falling off with the ratio outside it; 0.5 when either side is unknown"""
+    fit = np.full(len(lows), 0.5)
+    if not amount or amount <= 0:
+        return fit
+    with np.errstate(divide='ignore', invalid='ignore'):
+        below, above = amount < lows, amount > highs
+        ratio = np.where(below, lows / amount, np.where(above, amount / highs, 1.0))
+    known = ~np.isnan(lows)
+    fit[known] = 1.0 / np.maximum(ratio[known], 1.0)
+    return fit
+
+class FunderMatcher:
+    """Cached TF-IDF vectors of funder priorities and restrictions, scored against a grant in one pass
+
+    Each field's term counts are kept as a sparse matrix in coordinate form (row, column, count).
+    Changing a funder only queues its row's new entries; on the next match the stale rows are
+    masked out, queued rows appended, and IDF weights and row norms recomputed, all vectorised.
+    """
+    FIELDS = ("priorities", "restrictions")
+
+    def __init__(self):
+        self.rows = {}                  # funder id -> row
+        self.funders = []               # row -> {"id", "name", "typical_award_range"}, None once removed
+        self.entries = {field: (np.zeros(0, dtype=np.int64),) * 3 for field in self.FIELDS}   # (rows, columns, counts)
+        self.pending = {field: {} for field in self.FIELDS}    # row -> queued (columns, counts)
+        self.stale_rows = set()
+        self.lows, self.highs = [], []
+        self.vocabulary = {}            # term -> column
+        self.free = []
+        self.cache = None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def clear(self):
+        self.__init__()
+
+    def put(self, funder: dict):
+        row = self.rows.get(funder['id'])
+        if row is None:
+            row = self.free.pop() if self.free else len(self.funders)
+            if row == len(self.funders):
+                self.funders.append(None)
+                self.lows.append(math.nan)
+                self.highs.append(math.nan)
+            self.rows[funder['id']] = row
+        self.funders[row] = {key: funder.get(key, "") for key in ("id", "name", "typical_award_range")}
+        self.lows[row], self.highs[row] = parse_award_range(funder.get('typical_award_range'))
+        for field in self.FIELDS:
+            columns = [self.vocabulary.setdefault(term, len(self.vocabulary)) for term in tokenize(funder.get(field))]
+            self.pending[field][row] = np.unique(np.array(columns, dtype=np.int64), return_counts=True)
+        self.stale_rows.add(row)
+        self.cache = None
+
+    def apply_pending(self):
+        """Fold queued row changes into each field's coordinate arrays"""
+        stale = np.fromiter(self.stale_rows, dtype=np.int64, count=len(self.stale_rows))
+        for field in self.FIELDS:
+            rows, columns, counts = self.entries[field]
+            keep = ~np.isin(rows, stale)
+            pending = self.pending[field]
+            self.entries[field] = (
+                np.concatenate([rows[keep]] + [np.full(len(c), row, dtype=np.int64) for row, (c, _) in pending.items()]),
+                np.concatenate([columns[keep]] + [c for c, _ in pending.values()]),
+                np.concatenate([counts[keep]] + [n for _, n in pending.values()])
+            )
+            self.pending[field] = {}
+        self.stale_rows = set()
+
+    def remove(self, funder_id: str):
+        row = self.rows.pop(funder_id, None)
+        if row is None:
+            return
+        self.funders[row] = None
+        self.lows[row] = self.highs[row] = math.nan
+        for field in self.FIELDS:
+            self.pending[field].pop(row, None)
+        self.stale_rows.add(row)
+        self.free.append(row)
+        self.cache = None
+
+    def matrices(self) -> dict:
+        """Row-normalised TF-IDF matrices per field, with the IDF vector used to weight queries"""
+        if self.cache is None:
+            self.apply_pending()
+            size, live = len(self.funders), max(len(self.rows), 1)
+            self.cache = {"lows": np.array(self.lows, dtype=float), "highs": np.array(self.highs, dtype=float)}
+            for field in self.FIELDS:
+                rows, columns, counts = self.entries[field]
+                df = np.bincount(columns, minlength=len(self.vocabulary))
+                idf = np.log((1 + live) / (1 + df)) + 1
+                weights = (1 + np.log(counts.astype(float))) * idf[columns]
+                norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=size))
+                self.cache[field] = (rows, columns, weights / np.where(norms[rows] > 0, norms[rows], 1), idf)
+        return self.cache
+
+    def match(self, text: str, amount: float, limit: int = 10) -> List[dict]:
+        """Rank funders for a grant's text and requested amount"""
+        if not self.rows:
+            return []
+        matrices = self.matrices()
+        size = len(self.funders)
+        query = {}
+        for term in tokenize(text):
+            if term in self.vocabulary:
+                query[self.vocabulary[term]] = query.get(self.vocabulary[term], 0) + 1
+        similarity = {}
+        for field in self.FIELDS:
+            rows, columns, values, idf = matrices[field]
+            vector = np.zeros(len(self.vocabulary))
+            if query:
+                query_columns = np.fromiter(query, dtype=np.int64)
+                weights = (1 + np.log(np.fromiter(query.values(), dtype=float))) * idf[query_columns]
+                vector[query_columns] = weights / np.linalg.norm(weights)
+            similarity[field] = np.bincount(rows, weights=values * vector[columns], minlength=size)
+        fit = amount_fit(amount, matrices["lows"], matrices["highs"])
+        scores = (MATCH_WEIGHTS["priorities"] * similarity["priorities"]
+                  + MATCH_WEIGHTS["amount"] * fit
+                  - MATCH_WEIGHTS["restrictions"] * similarity["restrictions"])
+        live = np.fromiter((f is not None for f in self.funders), dtype=bool, count=size)
+        candidates = np.flatnonzero(live)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        ranked = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return [{
+            "funder_id": self.funders[row]['id'],
+            "name": self.funders[row]['name'],
+            "typical_award_range": self.funders[row]['typical_award_range'],
+            "score": round(float(scores[row]), 4),
+            "priority_match": round(float(similarity["priorities"][row]), 4),
+            "restriction_match": round(float(similarity["restrictions"][row]), 4),
+            "amount_fit": round(float(fit[row]), 4)
+        } for row in ranked]
+
+funder_matcher = FunderMatcher()
+
+async def rebuild_funder_matcher() -> int:
+    funder_matcher.clear()
+    async for funder in db.funders.find({}, {"_id": 0, "id": 1, "name": 1, "typical_award_range": 1,
+                                             "priorities": 1, "restrictions": 1}):
+        funder_matcher.put(funder)
+    return len(funder_matcher)
+
+# ============== PAGINATION ==============
+# List endpoints page with an opaque keyset cursor over a stable sort ending in _id, so
+# every page is an index range scan regardless of how deep the client has paged.
+def encode_cursor(values: list) -> str:
+    return base64.urlsafe_b64encode(json_util.dumps(values).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json_util.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list):
+            raise ValueError(cursor)
+        return values
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_filter(sort: list, values: list) -> dict:
+    """Match documents strictly after `values` in `sort` order (nulls sort first ascending)"""
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        prefix = {f: v for (f, _), v in zip(sort[:i], values[:i])}
+        value = values[i]
+        if direction == 1:
+            clauses.append({**prefix, field: {"$ne": None} if value is None else {"$gt": value}})
+        elif value is not None:
+            clauses.append({**prefix, field: {"$lt": value}})
+            if field != "_id":
+                clauses.append({**prefix, field: None})
+    return {"$or": clauses} if len(clauses) > 1 else clauses[0]
+
+def page_sort(sort: Optional[list] = None) -> list:
+    """`sort` plus the _id tie-breaker, running in the primary key's direction so a
+    single compound index serves it (scanned backwards for descending sorts)"""
+    sort = sort or []
+    return sort + [("_id", sort[0][1] if sort else 1)]
+
+async def find_page(coll, query: dict, limit: int, cursor: Optional[str] = None,
+                    sort: Optional[list] = None, projection: Optional[dict] = None):
+    """Fetch one page of `coll`; returns (docs, next_cursor)"""
+    sort = page_sort(sort)
+    # Sort keys must be fetched to build the cursor even when the caller didn't ask for them
+    extra = []
+    if projection is not None:
+        extra = [field for field, _ in sort if field != "_id" and field not in projection]
+        projection = {**projection, **{field: 1 for field in extra}}
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(sort):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = {"$and": [query, keyset_filter(sort, values)]} if query else keyset_filter(sort, values)
+    docs = await coll.find(query, projection).sort(sort).limit(limit + 1).to_list(limit + 1)
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor([docs[-1].get(field) for field, _ in sort])
+    for doc in docs:
+        doc.pop('_id', None)
+        for field in extra:
+            doc.pop(field, None)
+    return docs, next_cursor
+
+# Lightweight projections returned by paged list requests unless `fields` says otherwise
+LIST_SUMMARIES = {
+    'content': ['category', 'title', 'tags', 'updated_at'],
+    'funders': ['name', 'typical_award_range', 'website', 'contact_name'],
+    'grants': ['title', 'funder_id', 'funder_name', 'stage', 'amount_requested', 'amount_awarded', 'deadline', 'program'],
+    'reporting': ['grant_id', 'report_type', 'title', 'due_date', 'frequency', 'status'],
+    'compliance': ['grant_id', 'requirement', 'category', 'deadline', 'is_completed'],
+    'budgets': ['name', 'grant_id', 'total', 'created_at'],
+    'outcomes': ['program', 'metric_type', 'title', 'value', 'time_period'],
+}
+LIST_MODELS = {
+    'content': ContentItem,
+    'funders': FunderProfile,
+    'grants': Grant,
+    'reporting': ReportingRequirement,
+    'compliance': ComplianceItem,
+    'budgets': BudgetTemplate,
+    'outcomes': OutcomeMetric,
+}
+
+def list_projection(collection: str, fields: Optional[str], limit: Optional[int], cursor: Optional[str]) -> Optional[dict]:
+    """Mongo projection for a list request.
+
+    `fields` is a comma-separated field list, "summary", or "*" for whole documents.
+    Paged requests default to the summary; legacy unpaged requests keep whole documents.
+    """
+    if fields is None:
+        fields = 'summary' if limit is not None or cursor is not None else '*'
+    if fields == '*':
+        return None
+    if fields == 'summary':
+        names = LIST_SUMMARIES[collection]
+    else:
+        names = [name.strip() for name in fields.split(',') if name.strip()]
+        unknown = [name for name in names if name not in LIST_MODELS[collection].model_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return {"id": 1, **{name: 1 for name in names}}
+
+def page_response(items: list, next_cursor: Optional[str], limit: Optional[int], cursor: Optional[str], response: Response):
+    """Envelope for clients that asked for a page; bare list (cursor in a header) for legacy clients"""
+    if limit is not None or cursor is not None:
+        return {"items": items, "next_cursor": next_cursor}
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
+
+# ============== UPDATES ==============
+# Updated documents carry a version that is bumped on every write and exposed as the ETag.
+# A client that sends it back in If-Match only overwrites the version it loaded.
+DOCUMENT_LABELS = {
+    "grants": "Grant",
+    "content": "Content",
+    "funders": "Funder",
+    "reporting": "Report",
+    "compliance": "Compliance item",
+    "budgets": "Budget",
+    "outcomes": "Outcome",
+}
+
+def if_match_version(if_match: Optional[str]) -> Optional[int]:
+    """The version in an If-Match header ("3", W/"3" or 3); None when absent or "*" """
+    if not if_match or if_match.strip() == '*':
+        return None
+    try:
+        return int(if_match.strip().removeprefix('W/').strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid If-Match header")
+
+def set_etag(response: Optional[Response], doc: dict):
+    if response is not None and doc.get('version') is not None:
+        response.headers["ETag"] = f'"{doc["version"]}"'
+
+async def update_document(collection: str, doc_id: str, update_data: dict, if_match: Optional[str] = None,
+                          response: Optional[Response] = None, return_before: bool = False) -> dict:
+    """Apply a $set to one document in a single round trip and bump its version
+
+    Returns the updated document, or with return_before the document as it was before the
+    write. Raises 404 for unknown ids and 412 when If-Match names a version that is no longer current.
+    """
+    query = {"id": doc_id}
+    expected = if_match_version(if_match)
+    if expected is not None:
+        query["version"] = expected
+    update = {"$inc": {"version": 1}}
+    if update_data:
+        update["$set"] = update_data
+    doc = await db[collection].find_one_and_update(
+        query, update, projection={"_id": 0},
+        return_document=ReturnDocument.BEFORE if return_before else ReturnDocument.AFTER
+    )
+    if doc is None:
+        if expected is not None and await db[collection].find_one({"id": doc_id}, {"_id": 1}):
+            raise HTTPException(status_code=412, detail=f"{DOCUMENT_LABELS[collection]} was changed by someone else; reload and try again")
+        raise HTTPException(status_code=404, detail=f"{DOCUMENT_LABELS[collection]} not found")
+    set_etag(response, {"version": doc.get('version', 0) + 1} if return_before else doc)
+    return doc
 
 # ============== API ROUTES ==============
 
@@ -267,237 +1434,576 @@ async def root():
     return {"message": "GrantPilot API - Grant Management for Small Nonprofits"}
 
 # ----- Dashboard Metrics -----
-def days_until(date_str):
-    """Calculate days until a date string (YYYY-MM-DD format)"""
-    if not date_str:
+def days_until(value):
+    """Calculate days until a stored date (or legacy YYYY-MM-DD string)"""
+    if not value:
         return None
+    if isinstance(value, datetime):
+        return (value - datetime.now()).days
     try:
-        target = datetime.strptime(date_str[:10], "%Y-%m-%d")
+        target = datetime.strptime(value[:10], "%Y-%m-%d")
         today = datetime.now()
         return (target - today).days
     except:
         return None
 
+GRANT_STAGES = ['researching', 'writing', 'submitted', 'pending', 'awarded', 'declined', 'closed']
+ACTIVE_STAGES = ['researching', 'writing', 'submitted', 'pending']
+
+# ----- Dashboard Summary -----
+# Stage counts and pipeline totals only change when a grant is written, so they are kept
+# in a single materialized document updated with $inc deltas instead of recomputed per load.
+SUMMARY_ID = "default"
+
+def grant_summary_delta(grant: Optional[dict], sign: int = 1) -> dict:
+    """$inc contribution of one grant document to the dashboard summary"""
+    if not grant:
+        return {}
+    stage = grant.get('stage') or 'researching'
+    delta = {f"pipeline.{stage}": sign}
+    if stage in ACTIVE_STAGES:
+        delta['total_pending'] = sign * (grant.get('amount_requested') or 0)
+    if stage == 'awarded':
+        delta['total_awarded'] = sign * (grant.get('amount_awarded') or 0)
+    return delta
+
+def grant_transition_delta(before: Optional[dict], after: Optional[dict]) -> dict:
+    """Net $inc for a grant going from `before` to `after` (either may be None)"""
+    delta = grant_summary_delta(before, -1)
+    for key, value in grant_summary_delta(after, 1).items():
+        delta[key] = delta.get(key, 0) + value
+    return {k: v for k, v in delta.items() if v}
+
+async def apply_summary_delta(delta: dict):
+    if delta:
+        await db.dashboard_summary.update_one({"id": SUMMARY_ID}, {"$inc": delta}, upsert=True)
+
+async def rebuild_dashboard_summary() -> dict:
+    """Recompute the dashboard summary from the grants collection"""
+    rows = await db.grants.aggregate([
+        {"$group": {
+            "_id": {"$ifNull": ["$stage", "researching"]},
+            "count": {"$sum": 1},
+            "requested": {"$sum": {"$ifNull": ["$amount_requested", 0]}},
+            "awarded": {"$sum": {"$ifNull": ["$amount_awarded", 0]}},
+        }}
+    ]).to_list(None)
+    
+    summary = {
+        'id': SUMMARY_ID,
+        'pipeline': {stage: 0 for stage in GRANT_STAGES},
+        'total_pending': 0,
+        'total_awarded': 0,
+    }
+    for row in rows:
+        summary['pipeline'][row['_id']] = row['count']
+        if row['_id'] in ACTIVE_STAGES:
+            summary['total_pending'] += row['requested']
+        if row['_id'] == 'awarded':
+            summary['total_awarded'] += row['awarded']
+    summary['rebuilt_at'] = datetime.now(timezone.utc).isoformat()
+    
+    await db.dashboard_summary.replace_one({"id": SUMMARY_ID}, summary, upsert=True)
+    return summary
+
+@api_router.post("/admin/rebuild-dashboard-summary")
+async def admin_rebuild_dashboard_summary():
+    """Rebuild the materialized dashboard summary to repair drift"""
+    summary = await rebuild_dashboard_summary()
+    summary.pop('_id', None)
+    return summary
+
+# ----- Deadline Timeline -----
+# Application, report and compliance deadlines are denormalized into one `deadlines`
+# collection, indexed on (is_open, date), so the dashboard and calendar never merge or
+# re-parse the source collections per request. Write endpoints keep it in sync.
+DEADLINE_TYPES = {'grant': 'application', 'report': 'report', 'compliance': 'compliance'}
+
+def deadline_entry(kind: str, doc: dict) -> Optional[dict]:
+    """Timeline row for a grant/report/compliance document, or None if it has no usable date"""
+    if kind == 'grant':
+        date = doc.get('deadline')
+        entry = {
+            'grant_id': doc['id'],
+            'title': doc.get('title', ''),
+            'stage': doc.get('stage', 'researching'),
+            'is_open': doc.get('stage', 'researching') in ACTIVE_STAGES,
+            'description': f"Grant application deadline for {doc.get('funder_name', 'Unknown Funder')}. Amount: ${doc.get('amount_requested', 0):,}"
+        }
+    elif kind == 'report':
+        date = doc.get('due_date')
+        entry = {
+            'grant_id': doc.get('grant_id'),
+            'title': doc.get('title', ''),
+            'report_type': doc.get('report_type'),
+            'is_open': doc.get('status') in ['upcoming', 'in-progress'],
+            'description': f"Type: {doc.get('report_type', 'Report')}. {doc.get('description', '')}"
+        }
+    else:
+        date = doc.get('deadline')
+        entry = {
+            'grant_id': doc.get('grant_id'),
+            'title': doc.get('requirement', ''),
+            'is_open': not doc.get('is_completed'),
+            'description': doc.get('requirement', '')
+        }
+    date = coerce_date(date)
+    if date is None:
+        return None
+    entry.update({
+        'id': f"{kind}:{doc['id']}",
+        'source_id': doc['id'],
+        'type': DEADLINE_TYPES[kind],
+        'date': date
+    })
+    return entry
+
+async def sync_deadlines(kind: str, docs: List[dict]):
+    """Upsert (or drop, when undated) the timeline rows for the given source documents"""
+    ops = []
+    for doc in docs:
+        if not doc:
+            continue
+        entry = deadline_entry(kind, doc)
+        if entry:
+            ops.append(ReplaceOne({"id": entry['id']}, entry, upsert=True))
+        else:
+            ops.append(DeleteOne({"id": f"{kind}:{doc['id']}"}))
+    if ops:
+        await db.deadlines.bulk_write(ops, ordered=False)
+
+async def remove_deadlines(kind: str, source_id: str):
+    await db.deadlines.delete_one({"id": f"{kind}:{source_id}"})
+
+async def rebuild_deadlines() -> int:
+    """Regenerate the whole timeline from grants, reporting and compliance"""
+    await db.deadlines.delete_many({})
+    for kind, coll in [('grant', db.grants), ('report', db.reporting), ('compliance', db.compliance)]:
+        batch = []
+        async for doc in coll.find({}, {"_id": 0}):
+            entry = deadline_entry(kind, doc)
+            if entry:
+                batch.append(entry)
+            if len(batch) >= 500:
+                await db.deadlines.insert_many(batch, ordered=False)
+                batch = []
+        if batch:
+            await db.deadlines.insert_many(batch, ordered=False)
+    return await db.deadlines.count_documents({})
+
+def deadline_query(start: Optional[str] = None, end: Optional[str] = None, include_closed: bool = False) -> dict:
+    """Filter on the (is_open, date) index for an inclusive YYYY-MM-DD range"""
+    query = {} if include_closed else {"is_open": True}
+    date_range = {}
+    if start:
+        date_range["$gte"] = parse_date_param(start, "start")
+    if end:
+        date_range["$lte"] = parse_date_param(end, "end")
+    if date_range:
+        query["date"] = date_range
+    return query
+
+@api_router.post("/admin/rebuild-deadlines")
+async def admin_rebuild_deadlines():
+    """Rebuild the deadline timeline from the source collections"""
+    return {"deadlines": await rebuild_deadlines()}
+
+@api_router.get("/deadlines")
+async def get_deadlines(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    types: Optional[List[Literal['application', 'report', 'compliance']]] = Query(None, alias="type"),
+    grant_id: Optional[str] = None,
+    include_closed: bool = False,
+    limit: int = Query(MAX_RESULTS, ge=1, le=1000)
+):
+    """Deadlines in date order, filtered by date range (YYYY-MM-DD, inclusive) and type"""
+    query = deadline_query(start, end, include_closed)
+    if types:
+        query["type"] = {"$in": types}
+    if grant_id:
+        query["grant_id"] = grant_id
+    rows = await db.deadlines.find(query, {"_id": 0}).sort("date", 1).limit(limit).to_list(limit)
+    for row in rows:
+        row['days_left'] = days_until(row['date'])
+        row['date'] = format_date(row['date'])
+    return rows
+
 @api_router.get("/dashboard")
 async def get_dashboard():
-    grants = await db.grants.find({}, {"_id": 0}).to_list(MAX_RESULTS)
-    reports = await db.reporting.find({}, {"_id": 0}).to_list(MAX_RESULTS)
-    compliance = await db.compliance.find({}, {"_id": 0}).to_list(MAX_RESULTS)
+    now = datetime.now()
+    today = datetime(now.year, now.month, now.day)
+    tomorrow = today + timedelta(days=1)
     
-    today = datetime.now().strftime("%Y-%m-%d")
+    summary = await db.dashboard_summary.find_one({"id": SUMMARY_ID}, {"_id": 0})
+    if not summary:
+        summary = await rebuild_dashboard_summary()
+    # days_until() is negative for today's date, so "upcoming" starts tomorrow.
+    # Submitted/pending applications stay on the calendar but are not dashboard alerts.
+    upcoming, overdue_count = await asyncio.gather(
+        db.deadlines.find(
+            {"is_open": True, "date": {"$gte": tomorrow}, "stage": {"$nin": ["submitted", "pending"]}},
+            {"_id": 0}
+        ).sort("date", 1).limit(10).to_list(10),
+        db.deadlines.count_documents(
+            {"is_open": True, "date": {"$lt": today}, "type": {"$in": ["report", "compliance"]}}
+        )
+    )
     
     # Pipeline counts
-    pipeline = {stage: 0 for stage in ['researching', 'writing', 'submitted', 'pending', 'awarded', 'declined', 'closed']}
-    total_pending = 0
-    total_awarded = 0
+    pipeline = {stage: 0 for stage in GRANT_STAGES}
+    pipeline.update(summary.get('pipeline', {}))
     
+    # Deadline alerts - already sorted by urgency and capped at 10
     upcoming_deadlines = []
-    
-    for g in grants:
-        pipeline[g.get('stage', 'researching')] += 1
-        if g.get('stage') in ['researching', 'writing', 'submitted', 'pending']:
-            total_pending += g.get('amount_requested', 0)
-        if g.get('stage') == 'awarded':
-            total_awarded += g.get('amount_awarded', 0)
-        
-        # Deadline alerts
-        if g.get('deadline') and g.get('stage') in ['researching', 'writing']:
-            deadline = g['deadline']
-            dl = days_until(deadline)
-            if dl is not None and dl >= 0:
-                upcoming_deadlines.append({
-                    'type': 'application',
-                    'grant_id': g['id'],
-                    'title': g['title'],
-                    'date': deadline,
-                    'days_left': dl
-                })
-    
-    # Reporting deadlines
-    for r in reports:
-        if r.get('status') in ['upcoming', 'in-progress'] and r.get('due_date'):
-            due = r['due_date']
-            dl = days_until(due)
-            if dl is not None and dl >= 0:
-                upcoming_deadlines.append({
-                    'type': 'report',
-                    'report_type': r.get('report_type'),
-                    'grant_id': r.get('grant_id'),
-                    'title': r['title'],
-                    'date': due,
-                    'days_left': dl
-                })
-    
-    # Compliance deadlines
-    for c in compliance:
-        if not c.get('is_completed') and c.get('deadline'):
-            deadline = c['deadline']
-            dl = days_until(deadline)
-            if dl is not None and dl >= 0:
-                upcoming_deadlines.append({
-                    'type': 'compliance',
-                    'grant_id': c.get('grant_id'),
-                    'title': c['requirement'],
-                    'date': deadline,
-                    'days_left': dl
-                })
-    
-    # Sort by urgency
-    upcoming_deadlines.sort(key=lambda x: x['days_left'])
-    
-    # Overdue items
-    overdue_reports = [r for r in reports if r.get('status') in ['upcoming', 'in-progress'] and r.get('due_date', '') < today]
-    overdue_compliance = [c for c in compliance if not c.get('is_completed') and c.get('deadline', '') and c.get('deadline', '') < today]
+    for d in upcoming:
+        entry = {'type': d['type']}
+        if d['type'] == 'report':
+            entry['report_type'] = d.get('report_type')
+        entry.update({
+            'grant_id': d.get('grant_id'),
+            'title': d['title'],
+            'date': format_date(d['date']),
+            'days_left': days_until(d['date'])
+        })
+        upcoming_deadlines.append(entry)
     
     return {
         'pipeline': pipeline,
-        'total_pending': total_pending,
-        'total_awarded': total_awarded,
+        'total_pending': summary.get('total_pending', 0),
+        'total_awarded': summary.get('total_awarded', 0),
         'active_grants': pipeline['awarded'],
         'in_progress': pipeline['researching'] + pipeline['writing'] + pipeline['submitted'] + pipeline['pending'],
-        'upcoming_deadlines': upcoming_deadlines[:10],
-        'overdue_count': len(overdue_reports) + len(overdue_compliance),
+        'upcoming_deadlines': upcoming_deadlines,
+        'overdue_count': overdue_count,
         'success_rate': round((pipeline['awarded'] / max(pipeline['awarded'] + pipeline['declined'], 1)) * 100)
     }
 
 # ----- Content Library -----
 @api_router.get("/content")
-async def get_content(category: Optional[str] = None):
+async def get_content(
+    response: Response,
+    category: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
     query = {"category": category} if category else {}
-    items = await db.content.find(query, {"_id": 0}).to_list(MAX_RESULTS)
-    return items
+    items, next_cursor = await find_page(db.content, query, limit or MAX_RESULTS, cursor,
+        projection=list_projection("content", fields, limit, cursor))
+    return page_response(items, next_cursor, limit, cursor, response)
 
 @api_router.post("/content")
 async def create_content(item: ContentItemCreate):
     obj = ContentItem(**item.model_dump())
     await db.content.insert_one(obj.model_dump())
+    index_document('content', obj.model_dump())
     return obj
 
 @api_router.put("/content/{item_id}")
-async def update_content(item_id: str, item: ContentItemCreate):
+async def update_content(item_id: str, item: ContentItemCreate, response: Response, if_match: Optional[str] = Header(None)):
     update_data = item.model_dump()
     update_data['updated_at'] = datetime.now(timezone.utc).isoformat()
-    await db.content.update_one({"id": item_id}, {"$set": update_data})
-    return await db.content.find_one({"id": item_id}, {"_id": 0})
+    updated = await update_document("content", item_id, update_data, if_match, response)
+    index_document('content', updated)
+    return updated
 
 @api_router.delete("/content/{item_id}")
 async def delete_content(item_id: str):
     await db.content.delete_one({"id": item_id})
+    unindex_document('content', item_id)
     return {"deleted": True}
 
 # ----- Funder Profiles -----
 @api_router.get("/funders")
-async def get_funders():
-    return await db.funders.find({}, {"_id": 0}).to_list(MAX_RESULTS)
+async def get_funders(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    funders, next_cursor = await find_page(db.funders, {}, limit or MAX_RESULTS, cursor,
+        projection=list_projection("funders", fields, limit, cursor))
+    return page_response(funders, next_cursor, limit, cursor, response)
 
 @api_router.get("/funders/{funder_id}")
-async def get_funder(funder_id: str):
+async def get_funder(funder_id: str, response: Response):
     funder = await db.funders.find_one({"id": funder_id}, {"_id": 0})
     if not funder:
         raise HTTPException(status_code=404, detail="Funder not found")
+    set_etag(response, funder)
     return funder
 
 @api_router.post("/funders")
 async def create_funder(funder: FunderProfileCreate):
     obj = FunderProfile(**funder.model_dump())
     await db.funders.insert_one(obj.model_dump())
+    index_document('funders', obj.model_dump())
+    funder_matcher.put(obj.model_dump())
     return obj
 
 @api_router.put("/funders/{funder_id}")
-async def update_funder(funder_id: str, funder: FunderProfileCreate):
-    await db.funders.update_one({"id": funder_id}, {"$set": funder.model_dump()})
-    return await db.funders.find_one({"id": funder_id}, {"_id": 0})
+async def update_funder(funder_id: str, funder: FunderProfileCreate, response: Response, if_match: Optional[str] = Header(None)):
+    updated = await update_document("funders", funder_id, funder.model_dump(), if_match, response)
+    index_document('funders', updated)
+    funder_matcher.put(updated)
+    return updated
 
 @api_router.delete("/funders/{funder_id}")
 async def delete_funder(funder_id: str):
     await db.funders.delete_one({"id": funder_id})
+    unindex_document('funders', funder_id)
+    funder_matcher.remove(funder_id)
     return {"deleted": True}
 
 # ----- Grants Pipeline -----
+# Every filter/sort combination below is backed by a compound index in create_indexes()
+GRANT_SORTS = {
+    'created': [],
+    'deadline': [("deadline", 1)],
+    '-deadline': [("deadline", -1)],
+    'amount': [("amount_requested", 1)],
+    '-amount': [("amount_requested", -1)],
+}
+
+def grant_filter(
+    stages: Optional[List[str]] = None,
+    funder_id: Optional[str] = None,
+    program: Optional[str] = None,
+    deadline_from: Optional[datetime] = None,
+    deadline_to: Optional[datetime] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None
+) -> dict:
+    """Mongo filter for the pipeline view's grant query parameters"""
+    query = {}
+    if stages:
+        query["stage"] = stages[0] if len(stages) == 1 else {"$in": stages}
+    if funder_id:
+        query["funder_id"] = funder_id
+    if program:
+        query["program"] = program
+    if deadline_from or deadline_to:
+        query["deadline"] = {}
+        if deadline_from:
+            query["deadline"]["$gte"] = deadline_from
+        if deadline_to:
+            query["deadline"]["$lte"] = deadline_to
+    if min_amount is not None or max_amount is not None:
+        query["amount_requested"] = {}
+        if min_amount is not None:
+            query["amount_requested"]["$gte"] = min_amount
+        if max_amount is not None:
+            query["amount_requested"]["$lte"] = max_amount
+    return query
+
 @api_router.get("/grants")
-async def get_grants(stage: Optional[str] = None):
-    query = {"stage": stage} if stage else {}
-    return await db.grants.find(query, {"_id": 0}).to_list(MAX_RESULTS)
+async def get_grants(
+    response: Response,
+    stage: Optional[List[str]] = Query(None),
+    funder_id: Optional[str] = None,
+    program: Optional[str] = None,
+    deadline_from: Optional[str] = None,
+    deadline_to: Optional[str] = None,
+    min_amount: Optional[float] = Query(None, ge=0),
+    max_amount: Optional[float] = Query(None, ge=0),
+    sort: Literal['created', 'deadline', '-deadline', 'amount', '-amount'] = 'created',
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    # stage may be repeated (?stage=a&stage=b) or comma-separated (?stage=a,b)
+    stages = [s for value in stage or [] for s in value.split(',') if s]
+    query = grant_filter(
+        stages, funder_id, program,
+        parse_date_param(deadline_from, "deadline_from"), parse_date_param(deadline_to, "deadline_to"),
+        min_amount, max_amount
+    )
+    grants, next_cursor = await find_page(db.grants, query, limit or MAX_RESULTS, cursor,
+        sort=GRANT_SORTS[sort], projection=list_projection("grants", fields, limit, cursor))
+    return page_response([dates_to_api(g) for g in grants], next_cursor, limit, cursor, response)
 
 @api_router.get("/grants/{grant_id}")
-async def get_grant(grant_id: str):
+async def get_grant(grant_id: str, response: Response):
     grant = await db.grants.find_one({"id": grant_id}, {"_id": 0})
     if not grant:
         raise HTTPException(status_code=404, detail="Grant not found")
-    return grant
+    set_etag(response, grant)
+    return dates_to_api(grant)
+
+# Sections of the grant bundle and the collections they are joined from on grant_id
+GRANT_BUNDLE_SECTIONS = {"reports": "reporting", "compliance": "compliance", "budgets": "budgets"}
+
+def grant_deadline_stats(grant: dict, reports: List[dict], compliance: List[dict]) -> dict:
+    """Open/overdue counts and the next open deadline across a grant's reports and compliance items"""
+    now = datetime.now()
+    today = datetime(now.year, now.month, now.day)
+    open_items = [('report', r) for r in reports if r.get('status') in ['upcoming', 'in-progress']]
+    open_items += [('compliance', c) for c in compliance if not c.get('is_completed')]
+    dated = sorted(filter(None, (deadline_entry(kind, doc) for kind, doc in open_items)), key=lambda r: r['date'])
+    upcoming = [r for r in dated if r['date'] >= today]
+    next_deadline = None
+    if upcoming:
+        row = upcoming[0]
+        next_deadline = {'type': row['type'], 'title': row['title'], 'date': format_date(row['date']), 'days_left': days_until(row['date'])}
+    return {
+        'application_days_left': days_until(grant.get('deadline')),
+        'open': len(open_items),
+        'overdue': len(dated) - len(upcoming),
+        'completed': len(reports) + len(compliance) - len(open_items),
+        'next_deadline': next_deadline,
+    }
+
+@api_router.get("/grants/{grant_id}/bundle")
+async def get_grant_bundle(grant_id: str, response: Response):
+    """The grant with its funder, reports, compliance items, budgets and deadline stats in one aggregation"""
+    pipeline = [
+        {"$match": {"id": grant_id}},
+        {"$limit": 1},
+        {"$lookup": {"from": "funders", "localField": "funder_id", "foreignField": "id", "as": "funder"}},
+        *({"$lookup": {"from": name, "localField": "id", "foreignField": "grant_id", "as": section}}
+          for section, name in GRANT_BUNDLE_SECTIONS.items()),
+        {"$project": {"_id": 0, "funder._id": 0, **{f"{section}._id": 0 for section in GRANT_BUNDLE_SECTIONS}}},
+    ]
+    rows = await db.grants.aggregate(pipeline).to_list(1)
+    if not rows:
+        raise HTTPException(status_code=404, detail="Grant not found")
+    grant = rows[0]
+    funders = grant.pop('funder')
+    sections = {section: grant.pop(section) for section in GRANT_BUNDLE_SECTIONS}
+    stats = grant_deadline_stats(grant, sections['reports'], sections['compliance'])
+    set_etag(response, grant)
+    return {
+        "grant": dates_to_api(grant),
+        "funder": funders[0] if funders else None,
+        **{section: [dates_to_api(doc) for doc in docs] for section, docs in sections.items()},
+        "deadline_stats": stats,
+    }
+
+@api_router.get("/grants/{grant_id}/funder-matches")
+async def get_funder_matches(grant_id: str, limit: int = Query(10, ge=1, le=100)):
+    """Funders ranked by fit with the grant's program, title and notes, and its requested amount"""
+    grant = await db.grants.find_one({"id": grant_id}, {"_id": 0, "program": 1, "title": 1, "notes": 1, "amount_requested": 1})
+    if not grant:
+        raise HTTPException(status_code=404, detail="Grant not found")
+    text = " ".join(grant.get(field) or "" for field in ("program", "title", "notes"))
+    return funder_matcher.match(text, grant.get('amount_requested') or 0, limit)
 
 @api_router.post("/grants")
 async def create_grant(grant: GrantCreate):
     obj = Grant(**grant.model_dump())
     await db.grants.insert_one(obj.model_dump())
+    await apply_summary_delta(grant_transition_delta(None, obj.model_dump()))
+    await sync_deadlines('grant', [obj.model_dump()])
+    index_document('grants', obj.model_dump())
     return obj
 
 @api_router.put("/grants/{grant_id}")
-async def update_grant(grant_id: str, update: GrantUpdate):
-    update_data = {k: v for k, v in update.model_dump().items() if v is not None}
-    if update_data:
-        await db.grants.update_one({"id": grant_id}, {"$set": update_data})
-    return await db.grants.find_one({"id": grant_id}, {"_id": 0})
+async def update_grant(grant_id: str, update: GrantUpdate, response: Response, if_match: Optional[str] = Header(None)):
+    # Dates may be explicitly cleared with "" or null; other fields ignore nulls
+    update_data = {k: v for k, v in update.model_dump(exclude_unset=True).items() if v is not None or k in DATE_FIELDS}
+    # The summary and deadline deltas need the prior state; $set is atomic, so the result is before + update_data
+    before = await update_document("grants", grant_id, update_data, if_match, response, return_before=True)
+    after = {**before, **update_data, "version": before.get('version', 0) + 1}
+    await apply_summary_delta(grant_transition_delta(before, after))
+    await sync_deadlines('grant', [after])
+    index_document('grants', after)
+    return dates_to_api(after)
 
 @api_router.delete("/grants/{grant_id}")
 async def delete_grant(grant_id: str):
-    await db.grants.delete_one({"id": grant_id})
+    deleted = await db.grants.find_one_and_delete({"id": grant_id}, projection={"_id": 0})
+    await apply_summary_delta(grant_transition_delta(deleted, None))
     await db.reporting.delete_many({"grant_id": grant_id})
     await db.compliance.delete_many({"grant_id": grant_id})
+    await db.deadlines.delete_many({"grant_id": grant_id})
+    await db.award_documents.delete_many({"grant_id": grant_id})
+    unindex_document('grants', grant_id)
     return {"deleted": True}
 
 # ----- Reporting Requirements -----
 @api_router.get("/reporting")
-async def get_reporting(grant_id: Optional[str] = None):
+async def get_reporting(
+    response: Response,
+    grant_id: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
     query = {"grant_id": grant_id} if grant_id else {}
-    return await db.reporting.find(query, {"_id": 0}).to_list(MAX_RESULTS)
+    reports, next_cursor = await find_page(db.reporting, query, limit or MAX_RESULTS, cursor,
+        projection=list_projection("reporting", fields, limit, cursor))
+    return page_response([dates_to_api(r) for r in reports], next_cursor, limit, cursor, response)
 
 @api_router.post("/reporting")
 async def create_reporting(req: ReportingRequirementCreate):
     obj = ReportingRequirement(**req.model_dump())
     await db.reporting.insert_one(obj.model_dump())
+    await sync_deadlines('report', [obj.model_dump()])
     return obj
 
 @api_router.put("/reporting/{req_id}")
-async def update_reporting(req_id: str, status: str, submitted_date: str = ""):
+async def update_reporting(req_id: str, status: str, response: Response, submitted_date: str = "",
+                           if_match: Optional[str] = Header(None)):
     update = {"status": status}
     if submitted_date:
-        update["submitted_date"] = submitted_date
-    await db.reporting.update_one({"id": req_id}, {"$set": update})
-    return await db.reporting.find_one({"id": req_id}, {"_id": 0})
+        update["submitted_date"] = parse_date_param(submitted_date, "submitted")
+    report = await update_document("reporting", req_id, update, if_match, response)
+    await sync_deadlines('report', [report])
+    return dates_to_api(report)
 
 @api_router.delete("/reporting/{req_id}")
 async def delete_reporting(req_id: str):
     await db.reporting.delete_one({"id": req_id})
+    await remove_deadlines('report', req_id)
     return {"deleted": True}
 
 # ----- Compliance Items -----
 @api_router.get("/compliance")
-async def get_compliance(grant_id: Optional[str] = None):
+async def get_compliance(
+    response: Response,
+    grant_id: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
     query = {"grant_id": grant_id} if grant_id else {}
-    return await db.compliance.find(query, {"_id": 0}).to_list(MAX_RESULTS)
+    items, next_cursor = await find_page(db.compliance, query, limit or MAX_RESULTS, cursor,
+        projection=list_projection("compliance", fields, limit, cursor))
+    return page_response([dates_to_api(c) for c in items], next_cursor, limit, cursor, response)
 
 @api_router.post("/compliance")
 async def create_compliance(item: ComplianceItemCreate):
     obj = ComplianceItem(**item.model_dump())
     await db.compliance.insert_one(obj.model_dump())
+    await sync_deadlines('compliance', [obj.model_dump()])
     return obj
 
 @api_router.put("/compliance/{item_id}")
-async def update_compliance(item_id: str, is_completed: bool):
-    await db.compliance.update_one({"id": item_id}, {"$set": {"is_completed": is_completed}})
-    return await db.compliance.find_one({"id": item_id}, {"_id": 0})
+async def update_compliance(item_id: str, is_completed: bool, response: Response, if_match: Optional[str] = Header(None)):
+    item = await update_document("compliance", item_id, {"is_completed": is_completed}, if_match, response)
+    await sync_deadlines('compliance', [item])
+    return dates_to_api(item)
 
 @api_router.delete("/compliance/{item_id}")
 async def delete_compliance(item_id: str):
     await db.compliance.delete_one({"id": item_id})
+    await remove_deadlines('compliance', item_id)
     return {"deleted": True}
 
 # ----- Budget Templates -----
 @api_router.get("/budgets")
-async def get_budgets(grant_id: Optional[str] = None):
+async def get_budgets(
+    response: Response,
+    grant_id: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
     query = {"grant_id": grant_id} if grant_id else {}
-    return await db.budgets.find(query, {"_id": 0}).to_list(MAX_RESULTS)
+    budgets, next_cursor = await find_page(db.budgets, query, limit or MAX_RESULTS, cursor,
+        projection=list_projection("budgets", fields, limit, cursor))
+    return page_response(budgets, next_cursor, limit, cursor, response)
 
 @api_router.post("/budgets")
 async def create_budget(budget: BudgetTemplateCreate):
@@ -507,12 +2013,11 @@ async def create_budget(budget: BudgetTemplateCreate):
     return obj
 
 @api_router.put("/budgets/{budget_id}")
-async def update_budget(budget_id: str, budget: BudgetTemplateCreate):
+async def update_budget(budget_id: str, budget: BudgetTemplateCreate, response: Response, if_match: Optional[str] = Header(None)):
     total = sum(item.get('amount', 0) for item in budget.line_items)
     update_data = budget.model_dump()
     update_data['total'] = total
-    await db.budgets.update_one({"id": budget_id}, {"$set": update_data})
-    return await db.budgets.find_one({"id": budget_id}, {"_id": 0})
+    return await update_document("budgets", budget_id, update_data, if_match, response)
 
 @api_router.delete("/budgets/{budget_id}")
 async def delete_budget(budget_id: str):
@@ -521,26 +2026,37 @@ async def delete_budget(budget_id: str):
 
 # ----- Outcome Bank -----
 @api_router.get("/outcomes")
-async def get_outcomes(program: Optional[str] = None):
+async def get_outcomes(
+    response: Response,
+    program: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
     query = {"program": program} if program else {}
-    return await db.outcomes.find(query, {"_id": 0}).to_list(MAX_RESULTS)
+    outcomes, next_cursor = await find_page(db.outcomes, query, limit or MAX_RESULTS, cursor,
+        projection=list_projection("outcomes", fields, limit, cursor))
+    return page_response(outcomes, next_cursor, limit, cursor, response)
 
 @api_router.post("/outcomes")
 async def create_outcome(outcome: OutcomeMetricCreate):
     obj = OutcomeMetric(**outcome.model_dump())
     await db.outcomes.insert_one(obj.model_dump())
+    index_document('outcomes', obj.model_dump())
     return obj
 
 @api_router.put("/outcomes/{outcome_id}")
-async def update_outcome(outcome_id: str, outcome: OutcomeMetricCreate):
+async def update_outcome(outcome_id: str, outcome: OutcomeMetricCreate, response: Response, if_match: Optional[str] = Header(None)):
     update_data = outcome.model_dump()
     update_data['updated_at'] = datetime.now(timezone.utc).isoformat()
-    await db.outcomes.update_one({"id": outcome_id}, {"$set": update_data})
-    return await db.outcomes.find_one({"id": outcome_id}, {"_id": 0})
+    updated = await update_document("outcomes", outcome_id, update_data, if_match, response)
+    index_document('outcomes', updated)
+    return updated
 
 @api_router.delete("/outcomes/{outcome_id}")
 async def delete_outcome(outcome_id: str):
     await db.outcomes.delete_one({"id": outcome_id})
+    unindex_document('outcomes', outcome_id)
     return {"deleted": True}
 
 # ----- Settings -----
@@ -551,36 +2067,332 @@ async def get_settings():
 
 @api_router.put("/settings")
 async def update_settings(settings: OrgSettings):
-    await db.settings.update_one({"id": "default"}, {"$set": settings.model_dump()}, upsert=True)
+    await db.settings.update_one({"id": "default"}, {"$set": settings.model_dump(), "$inc": {"version": 1}}, upsert=True)
     return settings
 
+# ----- Batch Operations -----
+class ReportingStatusUpdate(BaseModel):
+    status: str
+    submitted_date: DateField = None
+
+class ComplianceStatusUpdate(BaseModel):
+    is_completed: bool
+
+class BatchOperation(BaseModel):
+    op: Literal['create', 'update', 'delete']
+    collection: Literal['grants', 'funders', 'content', 'reporting', 'compliance', 'budgets', 'outcomes']
+    id: Optional[str] = None
+    data: dict = {}
+    if_match: Optional[str] = None
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation] = Field(min_length=1, max_length=MAX_BATCH_OPERATIONS)
+
+# Stored, create and update models per collection; updates take the same fields as the PUT endpoints
+BATCH_MODELS = {
+    "grants": (Grant, GrantCreate, GrantUpdate),
+    "funders": (FunderProfile, FunderProfileCreate, FunderProfileCreate),
+    "content": (ContentItem, ContentItemCreate, ContentItemCreate),
+    "reporting": (ReportingRequirement, ReportingRequirementCreate, ReportingStatusUpdate),
+    "compliance": (ComplianceItem, ComplianceItemCreate, ComplianceStatusUpdate),
+    "budgets": (BudgetTemplate, BudgetTemplateCreate, BudgetTemplateCreate),
+    "outcomes": (OutcomeMetric, OutcomeMetricCreate, OutcomeMetricCreate),
+}
+DEADLINE_KINDS = {"grants": "grant", "reporting": "report", "compliance": "compliance"}
+
+def batch_create_doc(collection: str, data: dict) -> dict:
+    model, create_model, _ = BATCH_MODELS[collection]
+    fields = create_model(**data).model_dump()
+    if collection == 'budgets':
+        fields['total'] = sum(item.get('amount', 0) for item in fields['line_items'])
+    return model(**fields).model_dump()
+
+def batch_update_fields(collection: str, data: dict) -> dict:
+    update = BATCH_MODELS[collection][2](**data)
+    if collection == 'grants':
+        return {k: v for k, v in update.model_dump(exclude_unset=True).items() if v is not None or k in DATE_FIELDS}
+    fields = update.model_dump()
+    if collection == 'reporting' and fields['submitted_date'] is None:
+        del fields['submitted_date']
+    if collection == 'budgets':
+        fields['total'] = sum(item.get('amount', 0) for item in fields['line_items'])
+    if collection in ('content', 'outcomes'):
+        fields['updated_at'] = datetime.now(timezone.utc).isoformat()
+    return fields
+
+async def apply_batch_effects(collection: str, created: List[dict], changed: List[tuple], deleted: List[dict],
+                             exact: bool = True):
+    """Keep derived data (summary, timeline, search and matching indexes) in step with a batch's writes
+
+    With exact=False some of `deleted` may have been removed by another request, whose summary
+    delta is already applied, so the dashboard summary is recomputed instead.
+    """
+    afters = created + [after for _, after in changed]
+    kind = DEADLINE_KINDS.get(collection)
+    if collection == 'grants':
+        if exact:
+            delta = {}
+            for before, after in [(None, d) for d in created] + changed + [(d, None) for d in deleted]:
+                for key, value in grant_transition_delta(before, after).items():
+                    delta[key] = delta.get(key, 0) + value
+            await apply_summary_delta({k: v for k, v in delta.items() if v})
+        else:
+            await rebuild_dashboard_summary()
+        if deleted:
+            grant_ids = {"grant_id": {"$in": [d['id'] for d in deleted]}}
+            await asyncio.gather(*(db[name].delete_many(grant_ids) for name in ('reporting', 'compliance', 'deadlines', 'award_documents')))
+    elif kind and deleted:
+        await db.deadlines.delete_many({"id": {"$in": [f"{kind}:{d['id']}" for d in deleted]}})
+    if kind:
+        await sync_deadlines(kind, afters)
+    for doc in afters:
+        index_document(collection, doc)
+        if collection == 'funders':
+            funder_matcher.put(doc)
+    for doc in deleted:
+        unindex_document(collection, doc['id'])
+        if collection == 'funders':
+            funder_matcher.remove(doc['id'])
+
+async def run_batch_group(collection: str, operations: List[tuple], results: List[dict]):
+    """Write one collection's share of a batch with a single bulk_write and fill in per-operation results
+
+    Updates and deletes are conditional on the version just read. Updates also stamp a per-batch
+    `last_write` token, so when some of them miss, the token (not the version, which a concurrent
+    writer may have bumped to the same value) tells which ones this batch applied; it is removed
+    again once the results are settled. A delete that missed leaves its document in place.
+    """
+    coll = db[collection]
+    ids = [op.id for _, op, _, _ in operations if op.op != 'create']
+    current = {d['id']: d async for d in coll.find({"id": {"$in": ids}}, {"_id": 0})} if ids else {}
+    token = str(uuid.uuid4())
+    conflict = f"{DOCUMENT_LABELS[collection]} was changed by someone else; reload and try again"
+
+    writes, planned = [], []
+    for index, op, payload, expected in operations:
+        before = current.get(op.id)
+        if op.op != 'create':
+            if before is None:
+                results[index].update(status=404, error=f"{DOCUMENT_LABELS[collection]} not found")
+                continue
+            if expected is not None and before.get('version') != expected:
+                results[index].update(status=412, error=conflict)
+                continue
+        query = {"id": op.id, "version": before.get('version') if before else None}
+        if op.op == 'create':
+            writes.append(InsertOne(dict(payload)))
+        elif op.op == 'update':
+            writes.append(UpdateOne(query, {"$inc": {"version": 1}, "$set": {**payload, "last_write": token}}))
+        else:
+            writes.append(DeleteOne(query))
+        planned.append((index, op, payload, before))
+    if not writes:
+        return
+
+    try:
+        summary = (await coll.bulk_write(writes, ordered=False)).bulk_api_result
+    except BulkWriteError as e:
+        summary = e.details
+    failed = {err['index']: err.get('errmsg', 'Write failed') for err in summary.get('writeErrors', [])}
+    live = [(position, op) for position, (_, op, _, _) in enumerate(planned) if op.op != 'create' and position not in failed]
+    update_ids = [op.id for _, op in live if op.op == 'update']
+    delete_ids = [op.id for _, op in live if op.op == 'delete']
+    applied, present = set(update_ids), set()
+    if summary.get('nMatched', 0) < len(update_ids) or summary.get('nRemoved', 0) < len(delete_ids):
+        # Some conditional writes missed; read back which updates carry this batch's token and
+        # which deletes left their document behind
+        stamps = {d['id']: d.get('last_write') async for d in coll.find(
+            {"id": {"$in": update_ids + delete_ids}}, {"_id": 0, "id": 1, "last_write": 1})}
+        applied = {doc_id for doc_id in update_ids if stamps.get(doc_id) == token}
+        present = set(stamps)
+    if update_ids:
+        await coll.update_many({"id": {"$in": update_ids}, "last_write": token}, {"$unset": {"last_write": ""}})
+    # Deleted documents that are gone were removed by this batch unless another request deleted
+    # some of them too; then nRemoved falls short of the count and per-document credit is unknown
+    gone = [doc_id for doc_id in delete_ids if doc_id not in present]
+    exact = summary.get('nRemoved', 0) >= len(gone)
+
+    created, changed, deleted = [], [], []
+    for position, (index, op, payload, before) in enumerate(planned):
+        result = results[index]
+        if position in failed:
+            result.update(status=500, error=failed[position])
+        elif op.op == 'create':
+            created.append(payload)
+            result.update(status=201, doc=dates_to_api(dict(payload)))
+        elif op.op == 'update':
+            if op.id not in applied:
+                result.update(status=412 if op.id in present else 404,
+                              error=conflict if op.id in present else f"{DOCUMENT_LABELS[collection]} not found")
+                continue
+            after = {k: v for k, v in before.items() if k != 'last_write'}
+            after.update(payload, version=(before.get('version') or 0) + 1)
+            changed.append((before, after))
+            result.update(status=200, doc=dates_to_api(dict(after)))
+        elif op.id in present:
+            result.update(status=412, error=conflict)
+        else:
+            deleted.append(before)
+            result.update(status=200, deleted=True)
+    await apply_batch_effects(collection, created, changed, deleted, exact=exact)
+
+@api_router.post("/batch")
+async def run_batch(request: BatchRequest):
+    """Apply create/update/delete operations across collections with one bulk_write per collection
+
+    Operations are validated with the same models as the single-item endpoints and succeed or
+    fail individually; each result carries an HTTP-style status.
+    """
+    results, groups, seen = [], {}, set()
+    for index, op in enumerate(request.operations):
+        result = {"index": index, "op": op.op, "collection": op.collection, "id": op.id}
+        results.append(result)
+        if op.op != 'create':
+            if not op.id:
+                result.update(status=400, error="id is required")
+                continue
+            if (op.collection, op.id) in seen:
+                result.update(status=400, error="Each document may be updated or deleted once per batch")
+                continue
+            seen.add((op.collection, op.id))
+        try:
+            expected = if_match_version(op.if_match)
+            payload = None
+            if op.op == 'create':
+                payload = batch_create_doc(op.collection, op.data)
+                result["id"] = payload['id']
+            elif op.op == 'update':
+                payload = batch_update_fields(op.collection, op.data)
+        except ValidationError as e:
+            result.update(status=422, errors=validation_messages(e))
+            continue
+        except HTTPException as e:
+            result.update(status=e.status_code, error=e.detail)
+            continue
+        groups.setdefault(op.collection, []).append((index, op, payload, expected))
+
+    await asyncio.gather(*(run_batch_group(name, ops, results) for name, ops in groups.items()))
+    return {"results": results, "succeeded": sum(1 for r in results if r.get('status', 500) < 300)}
+
+# ----- Search -----
+@api_router.get("/search")
+async def search(
+    q: str = Query(..., min_length=1),
+    collection: Optional[List[str]] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None
+):
+    """Ranked full-text search over grants, funders, content and outcomes"""
+    # collection may be repeated or comma-separated, like /grants?stage=
+    collections = [c for value in collection or [] for c in value.split(',') if c]
+    unknown = set(collections) - set(SEARCH_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown collection: {', '.join(sorted(unknown))}")
+    offset = 0
+    if cursor:
+        values = decode_cursor(cursor)
+        # An offset cursor is exactly one non-negative int (bool is an int subclass, so exclude it)
+        if len(values) != 1 or type(values[0]) is not int or values[0] < 0:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        offset = values[0]
+
+    ranked = search_index.search(q, collections or None, limit=offset + limit + 1)
+    page = ranked[offset:offset + limit]
+    by_collection = {}
+    for (name, doc_id), _ in page:
+        by_collection.setdefault(name, []).append(doc_id)
+
+    async def fetch(name: str, ids: List[str]) -> dict:
+        projection = {"_id": 0, "id": 1, **{field: 1 for field in SEARCH_FIELDS[name]}}
+        return {doc['id']: doc async for doc in db[name].find({"id": {"$in": ids}}, projection)}
+
+    fetched = dict(zip(by_collection, await asyncio.gather(
+        *(fetch(name, ids) for name, ids in by_collection.items())
+    )))
+    query_terms = set(tokenize(q))
+    items = []
+    for (name, doc_id), score in page:
+        doc = fetched[name].get(doc_id)
+        if not doc:
+            continue
+        title_field = SEARCH_TITLES[name]
+        text = "\n\n".join(
+            " ".join(v) if isinstance(v, list) else str(v or "")
+            for field, v in doc.items() if field in SEARCH_FIELDS[name] and field != title_field
+        )
+        items.append({
+            "collection": name,
+            "id": doc_id,
+            "title": doc.get(title_field, ""),
+            "snippet": best_passage(text, query_terms, 240),
+            "score": round(score, 4)
+        })
+    next_cursor = encode_cursor([offset + limit]) if len(ranked) > offset + limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
 # ----- AI: Extract from Award Document -----
 class AwardDocumentRequest(BaseModel):
     grant_id: str
     base64_data: str
     mime_type: str
     filename: str = ""
-
-@api_router.post("/ai/extract-award")
-async def extract_award_document(request: AwardDocumentRequest):
-    """Extract reporting requirements, compliance deadlines, and grant terms from award documents"""
-    try:
-        data = request.base64_data
-        if ',' in data:
-            data = data.split(',')[1]
-        
-        content = ""
-        if request.mime_type == 'text/plain':
-            content = base64.b64decode(data).decode('utf-8')
-        elif 'pdf' in request.mime_type:
-            content = "[PDF document - extracting text content]"
-        else:
-            content = base64.b64decode(data).decode('utf-8', errors='ignore')
-        
-        prompt = f"""Analyze this grant award document and extract all reporting and compliance requirements.
-
+    use_cache: bool = True
+
+# Section starts: blank lines, or headings such as "Section 4", "ARTICLE II", "3.1 Reporting"
+SECTION_BREAK = re.compile(r'\n\s*\n|\n(?=(?:section|article|part|attachment|exhibit)\s+\w|\d+(?:\.\d+)*\.?\s+[A-Z])', re.IGNORECASE)
+
+def overlap_tail(text: str, overlap: int) -> str:
+    """The last `overlap` chars of `text`, starting at a whitespace boundary"""
+    if len(text) <= overlap:
+        return text
+    tail = text[-overlap:]
+    cut = re.search(r'\s', tail)
+    return tail[cut.end():].lstrip() if cut else tail
+
+def split_document(text: str, max_chars: int = EXTRACT_CHUNK_CHARS, overlap: int = EXTRACT_CHUNK_OVERLAP) -> List[str]:
+    """Split a document into chunks at section boundaries, each repeating up to `overlap` chars of the previous one
+
+    Trailing whole sections are carried when they fit; otherwise the tail of the previous chunk is.
+    """
+    if len(text) <= max_chars:
+        return [text]
+    # Sections longer than a chunk are sliced, keeping room for the carried overlap
+    step_chars = max(max_chars - overlap, 1)
+    pieces = []
+    for section in SECTION_BREAK.split(text):
+        section = section.strip()
+        while len(section) > step_chars:
+            pieces.append(section[:step_chars])
+            section = section[step_chars:]
+        if section:
+            pieces.append(section)
+
+    chunks, current, size = [], [], 0
+    for piece in pieces:
+        if current and size + len(piece) > max_chars:
+            chunks.append("\n\n".join(current))
+            carry, carry_size = [], 0
+            for prev in reversed(current):
+                if carry_size + len(prev) + 2 > overlap:
+                    break
+                carry.insert(0, prev)
+                carry_size += len(prev) + 2
+            if not carry and overlap > 2:
+                tail = overlap_tail(chunks[-1], overlap - 2)
+                carry, carry_size = ([tail], len(tail) + 2) if tail else ([], 0)
+            current, size = carry, carry_size
+        current.append(piece)
+        size += len(piece) + 2
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+def award_prompt(chunk: str, index: int, total: int) -> str:
+    part = f"\nThis is part {index + 1} of {total} of the document; extract only what appears in this part.\n" if total > 1 else ""
+    return f"""Analyze this grant award document and extract all reporting and compliance requirements.
+{part}
 Document content:
-{content[:8000]}
+{chunk}
 
 Extract and return as JSON:
 {{
@@ -626,128 +2438,610 @@ Common compliance items include:
 - Acknowledgment requirements
 """
 
-        result = await call_gemini_json(prompt)
-        
-        # Auto-create reporting requirements in database
-        created_reports = []
-        for req in result.get('reporting_requirements', []):
-            report = ReportingRequirement(
-                grant_id=request.grant_id,
-                report_type=req.get('report_type', 'other'),
-                title=req.get('title', 'Report'),
-                description=req.get('description', ''),
-                due_date=req.get('due_date', ''),
-                frequency=req.get('frequency', 'one-time')
-            )
-            await db.reporting.insert_one(report.model_dump())
-            created_reports.append(report.model_dump())
+
+def normalize_text(value) -> str:
+    return re.sub(r'[^a-z0-9]+', ' ', str(value or '').lower()).strip()
+
+def dedupe_items(items: list, title_field: str, date_field: str) -> list:
+    """Drop repeats by normalized title and date; an undated item is dropped when a dated one shares its title
+
+    Untitled or malformed items cannot be matched up, so they are kept to be created with a default
+    title or reported as failed rows.
+    """
+    entries, seen = [], set()
+    for item in items:
+        title = normalize_text(item.get(title_field)) if isinstance(item, dict) else ""
+        key = (title, coerce_date(item.get(date_field))) if title else None
+        if key is None or key not in seen:
+            entries.append((key, item))
+            if key:
+                seen.add(key)
+    dated_titles = {title for title, date in seen if date}
+    return [item for key, item in entries if key is None or key[1] or key[0] not in dated_titles]
+
+def merge_extractions(results: list) -> dict:
+    """Combine per-chunk extraction results into one, in document order"""
+    grant_info, reports, compliance, restrictions = {}, [], [], {}
+    for result in results:
+        if not isinstance(result, dict):
+            continue
+        for key, value in (result.get('grant_info') or {}).items():
+            if value and not grant_info.get(key):
+                grant_info[key] = value
+        reports += result.get('reporting_requirements') or []
+        compliance += result.get('compliance_items') or []
+        for restriction in result.get('restrictions') or []:
+            restrictions.setdefault(normalize_text(restriction), restriction)
+    return {
+        "grant_info": grant_info,
+        "reporting_requirements": dedupe_items(reports, 'title', 'due_date'),
+        "compliance_items": dedupe_items(compliance, 'requirement', 'deadline'),
+        "restrictions": [r for key, r in restrictions.items() if key]
+    }
+
+def decode_document(base64_data: str) -> bytes:
+    if ',' in base64_data:
+        base64_data = base64_data.split(',')[1]
+    return base64.b64decode(base64_data)
+
+def validation_messages(error: ValidationError) -> List[str]:
+    return [f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in error.errors()]
+
+def build_rows(collection: str, model, items: list, to_fields) -> tuple:
+    """Validate extracted items into model instances, collecting failures instead of stopping at the first"""
+    rows, failures = [], []
+    for index, item in enumerate(items):
+        try:
+            rows.append(model(**to_fields(item)))
+        except (ValidationError, AttributeError) as e:
+            errors = validation_messages(e) if isinstance(e, ValidationError) else ["item is not an object"]
+            failures.append({"collection": collection, "index": index, "errors": errors})
+    return rows, failures
+
+async def persist_extraction(grant_id: str, reports: list, compliance: list, update_data: dict) -> Optional[dict]:
+    """Write extracted rows and grant terms, in one transaction when the server supports it; returns the grant before update"""
+    async def write(session=None) -> list:
+        # Motor starts an operation when it is called, so writes are built lazily
+        writes = []
+        if reports:
+            writes.append(lambda: db.reporting.insert_many([r.model_dump() for r in reports], session=session))
+        if compliance:
+            writes.append(lambda: db.compliance.insert_many([c.model_dump() for c in compliance], session=session))
+        if update_data:
+            writes.append(lambda: db.grants.find_one_and_update(
+                {"id": grant_id}, {"$set": update_data, "$inc": {"version": 1}},
+                projection={"_id": 0}, return_document=ReturnDocument.BEFORE, session=session
+            ))
+        if session is None:
+            return await asyncio.gather(*(w() for w in writes))
+        # Operations within a session must not overlap
+        return [await w() for w in writes]
+
+    if transactions_supported:
+        async with await client.start_session() as session:
+            results = await session.with_transaction(write)
+    else:
+        results = await write()
+    return results[-1] if update_data else None
+
+async def extraction_rows_exist(stored: dict) -> bool:
+    """Whether any report or compliance row created by a finished extraction still exists"""
+    report_ids, compliance_ids = stored.get('report_ids') or [], stored.get('compliance_ids') or []
+    if not report_ids and not compliance_ids:
+        return True
+    found = await asyncio.gather(
+        db.reporting.find_one({"id": {"$in": report_ids}}, {"_id": 1}),
+        db.compliance.find_one({"id": {"$in": compliance_ids}}, {"_id": 1})
+    )
+    return any(found)
+
+async def claim_award_document(request: AwardDocumentRequest, digest: str, owner: Optional[str] = None) -> Optional[dict]:
+    """Reserve (digest, grant_id) for extraction; returns the stored record if this document was already handled
+
+    A claim left behind by a crashed attempt can be taken over once it times out, or at once by a
+    retry of the same job (same `owner`).
+    """
+    now = datetime.now(timezone.utc)
+    stale = {"started_at": {"$lt": now - timedelta(seconds=AWARD_CLAIM_TIMEOUT_SECONDS)}}
+    query = {"sha256": digest, "grant_id": request.grant_id, "status": "processing"}
+    query.update({"$or": [stale, {"owner": owner}]} if owner else stale)
+    try:
+        await db.award_documents.update_one(
+            query,
+            {"$set": {"started_at": now, "owner": owner, "filename": request.filename, "mime_type": request.mime_type},
+             "$setOnInsert": {"id": str(uuid.uuid4()), "created_at": now}},
+            upsert=True
+        )
+        return None
+    except DuplicateKeyError:
+        stored = await db.award_documents.find_one({"sha256": digest, "grant_id": request.grant_id}, {"_id": 0})
+        if stored and stored['status'] == 'done':
+            if await extraction_rows_exist(stored):
+                return stored
+            # Everything it created has been deleted since, so extract the document again
+            await db.award_documents.delete_one({"id": stored['id'], "status": "done"})
+            return await claim_award_document(request, digest, owner)
+        raise HTTPException(status_code=409, detail="This document is already being extracted for this grant")
+
+async def run_award_extraction(request: AwardDocumentRequest, data: Union[bytes, str, None] = None,
+                               digest: Optional[str] = None, progress=None, owner: Optional[str] = None) -> dict:
+    """Extract reporting requirements, compliance deadlines, and grant terms from award documents
+
+    `data` is the raw file (bytes or a spooled file's path) for uploads; otherwise request.base64_data is decoded.
+    `owner` identifies the job running the extraction, so its retries can reclaim the document.
+    """
+    async def step(percent: int, message: str):
+        if progress:
+            await progress(percent, message)
+
+    try:
+        await step(5, "Reading document")
+        if data is None:
+            data = decode_document(request.base64_data)
+        digest = digest or hashlib.sha256(data).hexdigest()
+
+        stored = await claim_award_document(request, digest, owner)
+        if stored:
+            return {**stored['response'], "document_id": stored['id'], "duplicate": True}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Award extraction error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    try:
+        content = await extract_document_text(data, request.mime_type, request.filename, digest)
+        if not content.strip():
+            raise HTTPException(status_code=422, detail="No text could be extracted from the document")
         
-        # Auto-create compliance items
-        created_compliance = []
-        for item in result.get('compliance_items', []):
-            comp = ComplianceItem(
-                grant_id=request.grant_id,
-                requirement=item.get('requirement', ''),
-                category=item.get('category', 'other'),
-                deadline=item.get('deadline', '')
-            )
-            await db.compliance.insert_one(comp.model_dump())
-            created_compliance.append(comp.model_dump())
+        chunks = split_document(content)
+        done = 0
+        semaphore = asyncio.Semaphore(EXTRACT_CONCURRENCY)
+
+        async def extract_chunk(index: int, chunk: str) -> dict:
+            nonlocal done
+            async with semaphore:
+                result = await call_gemini_json(award_prompt(chunk, index, len(chunks)), cache=request.use_cache)
+            done += 1
+            await step(20 + 50 * done // len(chunks), f"Extracted {done}/{len(chunks)} sections")
+            return result
+
+        await step(20, f"Extracting requirements from {len(chunks)} section(s)")
+        result = merge_extractions(await asyncio.gather(
+            *(extract_chunk(i, chunk) for i, chunk in enumerate(chunks))
+        ))
+        await step(70, "Saving requirements")
         
+        reports, report_failures = build_rows('reporting', ReportingRequirement, result.get('reporting_requirements', []), lambda req: dict(
+            grant_id=request.grant_id,
+            report_type=req.get('report_type', 'other'),
+            title=req.get('title') or 'Report',
+            description=req.get('description', ''),
+            due_date=coerce_date(req.get('due_date')),
+            frequency=req.get('frequency', 'one-time')
+        ))
+        compliance, compliance_failures = build_rows('compliance', ComplianceItem, result.get('compliance_items', []), lambda item: dict(
+            grant_id=request.grant_id,
+            requirement=item.get('requirement', ''),
+            category=item.get('category', 'other'),
+            deadline=coerce_date(item.get('deadline'))
+        ))
+
         # Update grant with extracted info
-        grant_info = result.get('grant_info', {})
-        if grant_info:
+        grant_info = result.get('grant_info') or {}
+        update_data = {}
+        if grant_info.get('award_amount'):
+            update_data['amount_awarded'] = grant_info['award_amount']
+        for field in ['grant_period_start', 'grant_period_end']:
+            period = coerce_date(grant_info.get(field))
+            if period:
+                update_data[field] = period
+        failures = report_failures + compliance_failures
+        try:
+            update_data = GrantUpdate(**update_data).model_dump(exclude_unset=True)
+        except ValidationError as e:
+            failures.append({"collection": "grants", "index": 0, "errors": validation_messages(e)})
             update_data = {}
-            if grant_info.get('award_amount'):
-                update_data['amount_awarded'] = grant_info['award_amount']
-            if grant_info.get('grant_period_start'):
-                update_data['grant_period_start'] = grant_info['grant_period_start']
-            if grant_info.get('grant_period_end'):
-                update_data['grant_period_end'] = grant_info['grant_period_end']
-            if update_data:
-                await db.grants.update_one({"id": request.grant_id}, {"$set": update_data})
+
+        before = await persist_extraction(request.grant_id, reports, compliance, update_data)
+        created_reports = [r.model_dump() for r in reports]
+        created_compliance = [c.model_dump() for c in compliance]
+        derived = [sync_deadlines('report', created_reports), sync_deadlines('compliance', created_compliance)]
+        if before:
+            derived += [
+                apply_summary_delta(grant_transition_delta(before, {**before, **update_data})),
+                sync_deadlines('grant', [{**before, **update_data}])
+            ]
+        await asyncio.gather(*derived)
         
-        return {
+        response = {
             "extracted": result,
             "created_reports": len(created_reports),
-            "created_compliance": len(created_compliance)
+            "created_compliance": len(created_compliance),
+            "failed_rows": failures,
+            "chunks": len(chunks)
         }
+        stored = await db.award_documents.find_one_and_update(
+            {"sha256": digest, "grant_id": request.grant_id},
+            {"$set": {
+                "status": "done",
+                "finished_at": datetime.now(timezone.utc),
+                "response": response,
+                "report_ids": [r['id'] for r in created_reports],
+                "compliance_ids": [c['id'] for c in created_compliance]
+            }},
+            projection={"id": 1}
+        )
+        return {**response, "document_id": stored['id'] if stored else None, "duplicate": False}
         
     except Exception as e:
+        # Release the claim so the document can be extracted again
+        await db.award_documents.delete_one({"sha256": digest, "grant_id": request.grant_id, "status": "processing"})
+        if isinstance(e, HTTPException):
+            raise
         logger.error(f"Award extraction error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Documents queued for extraction are kept in GridFS until their job finishes, so the job
+# itself only carries a file reference and stays far below the 16MB document limit
+def award_uploads() -> AsyncIOMotorGridFSBucket:
+    return AsyncIOMotorGridFSBucket(db, bucket_name="award_uploads")
+
+async def store_award_upload(source: Union[bytes, str], filename: str, digest: str) -> str:
+    """Save document bytes (or a spooled upload's path) to GridFS; returns the file id"""
+    if isinstance(source, str):
+        with open(source, 'rb') as file:
+            file_id = await award_uploads().upload_from_stream(filename or "document", file, metadata={"sha256": digest})
+    else:
+        file_id = await award_uploads().upload_from_stream(filename or "document", source, metadata={"sha256": digest})
+    return str(file_id)
+
+async def enqueue_award_extraction(request: AwardDocumentRequest, source: Union[bytes, str], digest: str) -> dict:
+    file_id = await store_award_upload(source, request.filename, digest)
+    payload = {**request.model_dump(exclude={'base64_data'}), "file_id": file_id, "sha256": digest, "owner": str(uuid.uuid4())}
+    try:
+        return await enqueue_job('extract-award', payload)
+    except Exception:
+        await award_uploads().delete(ObjectId(file_id))
+        raise
+
+async def extract_award_job(payload: dict, progress) -> dict:
+    fields = {k: v for k, v in payload.items() if k not in ('file_id', 'sha256', 'owner')}
+    request = AwardDocumentRequest(**{"base64_data": "", **fields})
+    # Jobs queued before uploads moved to GridFS still carry their base64 data
+    if not payload.get('file_id'):
+        return await run_award_extraction(request, progress=progress)
+    stream = await award_uploads().open_download_stream(ObjectId(payload['file_id']))
+    # Small documents are read into memory; larger ones are spooled to disk and parsed by path
+    with tempfile.NamedTemporaryFile(prefix='award-') as spooled:
+        if stream.length <= UPLOAD_SPOOL_BYTES:
+            source = await stream.read()
+        else:
+            while chunk := await stream.readchunk():
+                spooled.write(chunk)
+            spooled.flush()
+            source = spooled.name
+        return await run_award_extraction(request, data=source, digest=payload['sha256'], progress=progress, owner=payload.get('owner'))
+
+async def remove_award_upload(payload: dict):
+    if payload.get('file_id'):
+        await award_uploads().delete(ObjectId(payload['file_id']))
+
+JOB_HANDLERS['extract-award'] = extract_award_job
+JOB_CLEANUP['extract-award'] = remove_award_upload
+
+@api_router.post("/ai/extract-award")
+async def extract_award_document(request: AwardDocumentRequest):
+    """Extract reporting requirements, compliance deadlines, and grant terms from award documents"""
+    return await run_award_extraction(request)
+
+def upload_award_request(upload: dict) -> AwardDocumentRequest:
+    fields = upload['fields']
+    if not fields.get('grant_id'):
+        raise HTTPException(status_code=400, detail="grant_id is required")
+    return AwardDocumentRequest(
+        grant_id=fields['grant_id'],
+        base64_data="",
+        mime_type=upload['content_type'] or fields.get('mime_type', ''),
+        filename=upload['filename'],
+        use_cache=fields.get('use_cache', 'true').lower() not in ('false', '0', 'no')
+    )
+
+@api_router.post("/ai/extract-award/upload")
+async def upload_award_document(request: Request):
+    """Extract from a multipart upload (fields: grant_id, use_cache; one file) without base64 encoding"""
+    upload = await receive_upload(request)
+    try:
+        award = upload_award_request(upload)
+        return await run_award_extraction(award, data=upload_source(upload), digest=upload['sha256'])
+    finally:
+        upload['file'].close()
+
+@api_router.post("/ai/extract-award/jobs", status_code=202)
+async def submit_award_extraction(request: AwardDocumentRequest):
+    """Queue an award extraction and return its job id immediately"""
+    data = decode_document(request.base64_data)
+    job = await enqueue_award_extraction(request, data, hashlib.sha256(data).hexdigest())
+    return {"job_id": job['id'], "status": job['status']}
+
+@api_router.post("/ai/extract-award/jobs/upload", status_code=202)
+async def submit_award_upload(request: Request):
+    """Queue an award extraction from a multipart upload (fields: grant_id, use_cache; one file)"""
+    upload = await receive_upload(request)
+    try:
+        award = upload_award_request(upload)
+        job = await enqueue_award_extraction(award, upload_source(upload), upload['sha256'])
+    finally:
+        upload['file'].close()
+    return {"job_id": job['id'], "status": job['status']}
+
+# ----- Background Jobs -----
+@api_router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await db.jobs.find_one({"id": job_id}, {"_id": 0, "payload": 0, "result": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@api_router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    job = await db.jobs.find_one({"id": job_id}, {"_id": 0, "status": 1, "result": 1, "error": 1})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job['status'] != 'done':
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}" + (f": {job['error']}" if job.get('error') else ""))
+    return job['result']
+
 # ----- AI: Draft Content -----
 class DraftRequest(BaseModel):
     prompt: str
     context: str = ""
+    use_cache: bool = True
+    # Add the most relevant content library and outcome snippets, up to context_tokens
+    use_library: bool = True
+    context_tokens: int = Field(default=DRAFT_CONTEXT_TOKENS, ge=0, le=8000)
+
+async def library_snippets(query: str, token_budget: int) -> List[str]:
+    """Pick the most relevant content and outcome snippets that fit within token_budget"""
+    budget = token_budget * 4
+    if budget <= 0:
+        return []
+    ranked = [key for key, _ in search_index.search(query, ["content", "outcomes"], limit=20)]
+    by_collection = {}
+    for collection, doc_id in ranked:
+        by_collection.setdefault(collection, []).append(doc_id)
+
+    async def fetch(collection: str, ids: List[str]) -> dict:
+        return {doc['id']: doc async for doc in db[collection].find({"id": {"$in": ids}}, {"_id": 0})}
+
+    fetched = dict(zip(by_collection, await asyncio.gather(
+        *(fetch(collection, ids) for collection, ids in by_collection.items())
+    )))
+    query_terms = set(tokenize(query))
+    snippets = []
+    for collection, doc_id in ranked:
+        if budget < 200:
+            break
+        doc = fetched[collection].get(doc_id)
+        if not doc:
+            continue
+        if collection == 'content':
+            header = f"[{doc.get('title', '')}] "
+            body = best_passage(doc.get('content', ''), query_terms, budget - len(header))
+        else:
+            header = f"[Outcome: {doc.get('title', '')}] "
+            body = " ".join(filter(None, [doc.get('value'), doc.get('time_period'), doc.get('notes')]))[:budget - len(header)]
+        snippet = header + body
+        snippets.append(snippet)
+        budget -= len(snippet) + 1
+    return snippets
+
+async def draft_prompt(request: DraftRequest) -> str:
+    library = ""
+    if request.use_library:
+        snippets = await library_snippets(f"{request.prompt} {request.context}", request.context_tokens)
+        if snippets:
+            library = "\n\nOrganization facts (use where relevant, do not invent others):\n" + "\n".join(snippets)
+    return f"""Help draft grant content for a small nonprofit.
+
+Request: {request.prompt}
+
+Context: {request.context}{library}
+
+Provide clear, professional, funder-ready content. Be concise but thorough."""
 
 @api_router.post("/ai/draft")
 async def ai_draft(request: DraftRequest):
     """General AI drafting assistance"""
-    prompt = f"""Help draft grant content for a small nonprofit.
+    content = await call_gemini(await draft_prompt(request), cache=request.use_cache)
+    return {"content": content}
 
-Request: {request.prompt}
+class DraftSection(BaseModel):
+    id: str = ""
+    prompt: str
 
-Context: {request.context}
+class DraftBatchRequest(BaseModel):
+    sections: List[DraftSection] = Field(min_length=1, max_length=MAX_DRAFT_BATCH)
+    context: str = ""
+    use_cache: bool = True
+    use_library: bool = True
+
+@api_router.post("/ai/draft/batch")
+async def ai_draft_batch(request: DraftBatchRequest):
+    """Draft several sections concurrently, streaming one NDJSON line per section as each finishes"""
+    async def draft(index: int, section: DraftSection) -> dict:
+        result = {"index": index, "id": section.id or str(index)}
+        started = time.monotonic()
+        try:
+            prompt = await draft_prompt(DraftRequest(
+                prompt=section.prompt, context=request.context, use_library=request.use_library
+            ))
+            result["content"] = await call_gemini(prompt, cache=request.use_cache)
+        except Exception as e:
+            result["error"] = e.detail if isinstance(e, HTTPException) else str(e)
+        result["elapsed_ms"] = round((time.monotonic() - started) * 1000)
+        return result
+
+    async def lines():
+        started = time.monotonic()
+        tasks = [asyncio.ensure_future(draft(i, section)) for i, section in enumerate(request.sections)]
+        failed = 0
+        try:
+            for finished in asyncio.as_completed(tasks):
+                result = await finished
+                failed += "error" in result
+                yield json.dumps(result) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+        yield json.dumps({"done": True, "drafted": len(tasks) - failed, "failed": failed,
+                          "total_ms": round((time.monotonic() - started) * 1000)}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@api_router.post("/ai/draft/stream")
+async def ai_draft_stream(request: DraftRequest):
+    """Draft as server-sent events: `token` events as text arrives, then `done` with the full text and timing"""
+    prompt = await draft_prompt(request)
+    key = llm_cache_key(DEFAULT_SYSTEM_MSG, prompt) if request.use_cache else None
+    if not key:
+        llm_cache_stats["bypassed"] += 1
+
+    async def events():
+        started = time.monotonic()
+        first_token_ms = None
+        parts = []
+        cached = await cached_llm_response(key) if key else None
+
+        async def pieces():
+            if cached is not None:
+                yield cached
+            else:
+                async for text in stream_llm_message(prompt, DEFAULT_SYSTEM_MSG):
+                    yield text
+
+        try:
+            async for text in pieces():
+                if first_token_ms is None:
+                    first_token_ms = round((time.monotonic() - started) * 1000)
+                parts.append(text)
+                yield sse_event("token", {"text": text})
+        except Exception as e:
+            logger.error(f"AI streaming error: {e}")
+            detail = e.detail if isinstance(e, HTTPException) else f"AI service error: {e}"
+            yield sse_event("error", {"detail": detail})
+            return
+        content = "".join(parts)
+        if key and cached is None:
+            await store_llm_response(key, content)
+        yield sse_event("done", {
+            "content": content,
+            "cached": cached is not None,
+            "first_token_ms": first_token_ms,
+            "total_ms": round((time.monotonic() - started) * 1000)
+        })
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# ----- AI: Response Cache -----
+@api_router.get("/ai/cache-stats")
+async def ai_cache_stats():
+    """Hit/miss counters for the LLM response cache since startup"""
+    lookups = llm_cache_stats["memory_hits"] + llm_cache_stats["db_hits"] + llm_cache_stats["misses"]
+    hits = llm_cache_stats["memory_hits"] + llm_cache_stats["db_hits"]
+    return {
+        **llm_cache_stats,
+        "hit_rate": round(hits / lookups, 3) if lookups else 0,
+        "memory_entries": len(llm_cache),
+        "stored_entries": await db.llm_cache.estimated_document_count()
+    }
 
-Provide clear, professional, funder-ready content. Be concise but thorough."""
-    
-    content = await call_gemini(prompt)
-    return {"content": content}
+@api_router.delete("/ai/cache")
+async def clear_ai_cache():
+    llm_cache.clear()
+    result = await db.llm_cache.delete_many({})
+    return {"deleted": result.deleted_count}
 
 # ----- Calendar Export -----
 @api_router.get("/calendar/export")
-async def export_calendar():
+async def export_calendar(start: Optional[str] = None, end: Optional[str] = None):
     """Generate ICS file with all deadlines"""
-    grants = await db.grants.find({}, {"_id": 0}).to_list(MAX_RESULTS)
-    reports = await db.reporting.find({}, {"_id": 0}).to_list(MAX_RESULTS)
-    compliance = await db.compliance.find({}, {"_id": 0}).to_list(MAX_RESULTS)
-    
+    query = deadline_query(start, end)
+    prefixes = {'application': 'DEADLINE', 'report': 'REPORT DUE', 'compliance': 'COMPLIANCE'}
     events = []
-    
-    # Grant deadlines
-    for g in grants:
-        if g.get('deadline') and g.get('stage') in ['researching', 'writing', 'submitted', 'pending']:
-            events.append({
-                'title': f"DEADLINE: {g['title']}",
-                'date': g['deadline'],
-                'description': f"Grant application deadline for {g.get('funder_name', 'Unknown Funder')}. Amount: ${g.get('amount_requested', 0):,}"
-            })
-    
-    # Reporting deadlines
-    for r in reports:
-        if r.get('due_date') and r.get('status') in ['upcoming', 'in-progress']:
-            events.append({
-                'title': f"REPORT DUE: {r['title']}",
-                'date': r['due_date'],
-                'description': f"Type: {r.get('report_type', 'Report')}. {r.get('description', '')}"
-            })
-    
-    # Compliance deadlines
-    for c in compliance:
-        if c.get('deadline') and not c.get('is_completed'):
-            events.append({
-                'title': f"COMPLIANCE: {c['requirement'][:50]}",
-                'date': c['deadline'],
-                'description': c['requirement']
-            })
+    projection = {"_id": 0, "type": 1, "title": 1, "date": 1, "description": 1}
+    async for d in db.deadlines.find(query, projection).sort("date", 1):
+        title = d['title'][:50] if d['type'] == 'compliance' else d['title']
+        events.append({
+            'title': f"{prefixes[d['type']]}: {title}",
+            'date': format_date(d['date']),
+            'description': d.get('description', '')
+        })
     
     return {"events": events}
 
 # ----- Data Export/Import -----
+# Exports stream straight from batched cursors so memory stays flat and nothing is truncated
+EXPORT_COLLECTIONS = ['content', 'funders', 'grants', 'reporting', 'compliance', 'budgets', 'outcomes', 'settings']
+EXPORT_BATCH_SIZE = 500
+
+async def export_chunks(fmt: str):
+    """Yield the export as text chunks: one JSON object (legacy shape) or NDJSON lines"""
+    if fmt == 'json':
+        yield '{'
+    for i, name in enumerate(EXPORT_COLLECTIONS):
+        if fmt == 'json':
+            yield f'{"," if i else ""}"{name}": ['
+        buffer = []
+        count = 0
+        async for doc in db[name].find({}, {"_id": 0}).batch_size(EXPORT_BATCH_SIZE):
+            if name in DATE_COLLECTIONS:
+                dates_to_api(doc)
+            if fmt == 'ndjson':
+                buffer.append(json.dumps({"collection": name, "doc": doc}, default=str) + "\n")
+            else:
+                buffer.append(("," if count else "") + json.dumps(doc, default=str))
+            count += 1
+            if len(buffer) >= EXPORT_BATCH_SIZE:
+                yield ''.join(buffer)
+                buffer = []
+        if buffer:
+            yield ''.join(buffer)
+        if fmt == 'json':
+            yield ']'
+    if fmt == 'json':
+        yield '}'
+
+async def gzip_chunks(chunks):
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    async for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
 @api_router.get("/export")
-async def export_all():
-    return {
-        "content": await db.content.find({}, {"_id": 0}).to_list(MAX_RESULTS),
-        "funders": await db.funders.find({}, {"_id": 0}).to_list(MAX_RESULTS),
-        "grants": await db.grants.find({}, {"_id": 0}).to_list(MAX_RESULTS),
-        "reporting": await db.reporting.find({}, {"_id": 0}).to_list(MAX_RESULTS),
-        "compliance": await db.compliance.find({}, {"_id": 0}).to_list(MAX_RESULTS),
-        "budgets": await db.budgets.find({}, {"_id": 0}).to_list(MAX_RESULTS),
-        "outcomes": await db.outcomes.find({}, {"_id": 0}).to_list(MAX_RESULTS),
-        "settings": await db.settings.find({}, {"_id": 0}).to_list(10)
-    }
+async def export_all(
+    fmt: Literal['json', 'ndjson'] = Query('json', alias="format"),
+    compress: bool = Query(False, alias="gzip")
+):
+    """Stream all data: the legacy JSON object by default, or NDJSON lines tagged with their collection"""
+    chunks = export_chunks(fmt)
+    filename = f"grantpilot-export-{datetime.now().strftime('%Y%m%d')}.{'ndjson' if fmt == 'ndjson' else 'json'}"
+    media_type = "application/x-ndjson" if fmt == 'ndjson' else "application/json"
+    if compress:
+        chunks = gzip_chunks(chunks)
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 class ImportRequest(BaseModel):
     content: List[dict] = []
@@ -759,22 +3053,292 @@ class ImportRequest(BaseModel):
     outcomes: List[dict] = []
     settings: List[dict] = []
 
+# Imports load into per-run staging collections in fixed-size batches, build indexes there,
+# and only then rename staging over live, so a failed import leaves live data untouched.
+IMPORT_BATCH_SIZE = 1000
+
+async def ndjson_records(request: Request):
+    """Yield (collection, doc) from a streamed NDJSON body, gunzipping on the fly if needed"""
+    decompressor = None
+    buffer = b''
+    line_no = 0
+
+    def parse(line: bytes):
+        try:
+            record = json.loads(line)
+            return record['collection'], record['doc']
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(status_code=400, detail=f"Invalid NDJSON record on line {line_no}")
+
+    async for chunk in request.stream():
+        if decompressor is None and chunk:
+            gzipped = chunk[:2] == b'\x1f\x8b' or request.headers.get('content-encoding') == 'gzip'
+            decompressor = zlib.decompressobj(wbits=47) if gzipped else False
+        if decompressor:
+            chunk = decompressor.decompress(chunk)
+        buffer += chunk
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            line_no += 1
+            if line.strip():
+                yield parse(line)
+    if decompressor:
+        buffer += decompressor.flush()
+    for line in buffer.split(b'\n'):
+        line_no += 1
+        if line.strip():
+            yield parse(line)
+
+async def legacy_records(data: ImportRequest):
+    for name in EXPORT_COLLECTIONS:
+        for doc in getattr(data, name):
+            yield name, doc
+
+def staging_name(run_id: str, name: str) -> str:
+    return f"import_{run_id}_{name}"
+
+async def drop_staging(run_id: str):
+    for name in await db.list_collection_names(filter={"name": {"$regex": f"^import_{run_id}_"}}):
+        await db[name].drop()
+
+async def swap_in_staging(run_id: str, names: List[str]):
+    """Rename staging collections over live ones, restoring the previous data if any rename fails"""
+    existing = set(await db.list_collection_names())
+    swapped = []
+    try:
+        for name in names:
+            if name in existing:
+                await db[name].rename(staging_name(run_id, f"{name}_previous"))
+            swapped.append(name)
+            await db[staging_name(run_id, name)].rename(name)
+    except Exception:
+        for name in reversed(swapped):
+            if name in existing:
+                await db[staging_name(run_id, f"{name}_previous")].rename(name, dropTarget=True)
+            else:
+                await db[name].drop()
+        raise
+    finally:
+        await drop_staging(run_id)
+
+async def staged_import(records) -> dict:
+    """Load (collection, doc) records into staging, index them, then swap them in all at once"""
+    run_id = uuid.uuid4().hex[:8]
+    batches = {}
+    counts = {}
+
+    async def flush(name: str):
+        if batches.get(name):
+            await db[staging_name(run_id, name)].insert_many(batches[name], ordered=False)
+            counts[name] = counts.get(name, 0) + len(batches[name])
+            batches[name] = []
+
+    try:
+        async for name, doc in records:
+            if name not in EXPORT_COLLECTIONS or not isinstance(doc, dict):
+                raise HTTPException(status_code=400, detail=f"Invalid import record for collection: {name}")
+            doc.pop('_id', None)
+            batches.setdefault(name, []).append(dates_to_db(doc))
+            if len(batches[name]) >= IMPORT_BATCH_SIZE:
+                await flush(name)
+        for name in list(batches):
+            await flush(name)
+        for name in counts:
+            if INDEXES.get(name):
+                await db[staging_name(run_id, name)].create_indexes(INDEXES[name])
+    except Exception:
+        await drop_staging(run_id)
+        raise
+
+    await swap_in_staging(run_id, list(counts))
+    return counts
+
+# Merge imports keep the hash of what they last wrote per (collection, id) in import_hashes,
+# together with the version that write left on the document. A row is skipped only while the
+# live document still carries that version, so edits and deletes made since the last merge
+# (which bump or remove it) are restored, and an unchanged row costs two small indexed reads.
+# Versions are never taken from import data: merged writes bump the live version like any
+# other write, so an older export cannot bring back a version (and ETag) already handed out.
+def content_hash(doc: dict) -> str:
+    canonical = json.dumps(doc, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+async def merge_batch(name: str, batch: List[dict], counts: dict):
+    """Upsert one batch by id, writing only documents that differ from what the last merge left in place"""
+    batch = list({doc['id']: doc for doc in batch}.values())
+    hashes = {doc['id']: content_hash(doc) for doc in batch}
+    stored = {
+        h['id']: h
+        async for h in db.import_hashes.find({"collection": name, "id": {"$in": list(hashes)}}, {"_id": 0, "id": 1, "hash": 1, "version": 1})
+    }
+    same_hash = [i for i, h in hashes.items() if i in stored and stored[i]['hash'] == h]
+    live = {
+        doc['id']: doc.get('version')
+        async for doc in db[name].find({"id": {"$in": same_hash}}, {"_id": 0, "id": 1, "version": 1})
+    } if same_hash else {}
+    candidates = [
+        doc for doc in batch
+        if doc['id'] not in live or live[doc['id']] != stored[doc['id']].get('version')
+    ]
+    counts['unchanged'] += len(batch) - len(candidates)
+    if not candidates:
+        return
+
+    existing = {
+        doc['id']: doc
+        async for doc in db[name].find({"id": {"$in": [c['id'] for c in candidates]}}, {"_id": 0})
+    }
+    ops, versions = [], {}
+    for doc in candidates:
+        old = existing.get(doc['id'])
+        body = {k: v for k, v in doc.items() if k != 'version'}
+        if old is None:
+            ops.append(UpdateOne({"id": doc['id']}, {"$set": body, "$inc": {"version": 1}}, upsert=True))
+            versions[doc['id']] = 1
+            counts['inserted'] += 1
+            continue
+        changed = {k: v for k, v in body.items() if k not in old or old[k] != v}
+        removed = {k: "" for k in old if k not in body and k != 'version'}
+        if not changed and not removed:
+            versions[doc['id']] = old.get('version')
+            counts['unchanged'] += 1
+            continue
+        update = {"$inc": {"version": 1}}
+        if changed:
+            update["$set"] = changed
+        if removed:
+            update["$unset"] = removed
+        ops.append(UpdateOne({"id": doc['id']}, update))
+        versions[doc['id']] = (old.get('version') or 0) + 1
+        counts['updated'] += 1
+
+    hash_ops = [
+        UpdateOne({"collection": name, "id": doc['id']}, {"$set": {"hash": hashes[doc['id']], "version": versions[doc['id']]}}, upsert=True)
+        for doc in candidates
+    ]
+    writes = [db.import_hashes.bulk_write(hash_ops, ordered=False)]
+    if ops:
+        writes.append(db[name].bulk_write(ops, ordered=False))
+    await asyncio.gather(*writes)
+
+async def delete_missing_docs(name: str, keep_ids: set) -> int:
+    deleted = 0
+    stale = []
+    async for doc in db[name].find({}, {"_id": 0, "id": 1}):
+        if doc.get('id') not in keep_ids:
+            stale.append(doc.get('id'))
+        if len(stale) >= IMPORT_BATCH_SIZE:
+            deleted += (await db[name].delete_many({"id": {"$in": stale}})).deleted_count
+            await db.import_hashes.delete_many({"collection": name, "id": {"$in": stale}})
+            stale = []
+    if stale:
+        deleted += (await db[name].delete_many({"id": {"$in": stale}})).deleted_count
+        await db.import_hashes.delete_many({"collection": name, "id": {"$in": stale}})
+    return deleted
+
+async def merge_import(records, delete_missing: bool = False) -> dict:
+    """Upsert records by id in batches, skipping unchanged documents; optionally delete absent ones"""
+    batches = {}
+    seen_ids = {}
+    counts = {}
+    async for name, doc in records:
+        if name not in EXPORT_COLLECTIONS or not isinstance(doc, dict) or not doc.get('id'):
+            raise HTTPException(status_code=400, detail=f"Invalid import record for collection: {name}")
+        doc.pop('_id', None)
+        counts.setdefault(name, {"inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0})
+        seen_ids.setdefault(name, set()).add(doc['id'])
+        batches.setdefault(name, []).append(dates_to_db(doc))
+        if len(batches[name]) >= IMPORT_BATCH_SIZE:
+            await merge_batch(name, batches[name], counts[name])
+            batches[name] = []
+    for name, batch in batches.items():
+        if batch:
+            await merge_batch(name, batch, counts[name])
+    if delete_missing:
+        for name, ids in seen_ids.items():
+            counts[name]['deleted'] = await delete_missing_docs(name, ids)
+    return counts
+
 @api_router.post("/import")
-async def import_all(data: ImportRequest):
-    for coll, items in [
-        (db.content, data.content),
-        (db.funders, data.funders),
-        (db.grants, data.grants),
-        (db.reporting, data.reporting),
-        (db.compliance, data.compliance),
-        (db.budgets, data.budgets),
-        (db.outcomes, data.outcomes),
-        (db.settings, data.settings)
-    ]:
-        if items:
-            await coll.delete_many({})
-            await coll.insert_many(items)
-    return {"imported": True}
+async def import_all(
+    request: Request,
+    mode: Literal['replace', 'merge'] = 'replace',
+    delete_missing: bool = False
+):
+    """Import a backup.
+
+    Accepts the legacy JSON object (ImportRequest) or a streamed NDJSON export
+    (`application/x-ndjson`, optionally gzipped) as produced by /api/export?format=ndjson.
+    mode=replace atomically replaces every collection present in the payload; mode=merge
+    upserts by id, writing only documents that changed, and with delete_missing=true removes
+    documents absent from the payload.
+    """
+    content_type = request.headers.get('content-type', '')
+    if 'ndjson' in content_type or 'gzip' in content_type or request.headers.get('content-encoding') == 'gzip':
+        records = ndjson_records(request)
+    else:
+        try:
+            data = ImportRequest.model_validate(await request.json())
+        except (ValueError, ValidationError) as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        records = legacy_records(data)
+
+    if mode == 'merge':
+        counts = await merge_import(records, delete_missing)
+        changed = {name for name, c in counts.items() if c['inserted'] or c['updated'] or c['deleted']}
+    else:
+        counts = await staged_import(records)
+        changed = set(counts)
+        await db.import_hashes.delete_many({"collection": {"$in": list(changed)}})
+    if 'grants' in changed:
+        await rebuild_dashboard_summary()
+    if changed & {'grants', 'reporting', 'compliance'}:
+        await rebuild_deadlines()
+    if changed & set(SEARCH_FIELDS):
+        await rebuild_search_index()
+    if 'funders' in changed:
+        await rebuild_funder_matcher()
+    return {"imported": True, "mode": mode, "counts": counts}
+
+# ----- Date Migration -----
+async def migrate_date_fields(dry_run: bool = False) -> dict:
+    """Convert legacy string date fields to BSON dates in bulk, reporting values that don't parse"""
+    converted = {}
+    unparseable = []
+    for coll_name, fields in DATE_COLLECTIONS.items():
+        coll = db[coll_name]
+        converted[coll_name] = 0
+        ops = []
+        query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+        projection = {"_id": 1, "id": 1, **{field: 1 for field in fields}}
+        async for doc in coll.find(query, projection):
+            update = {}
+            for field in fields:
+                value = doc.get(field)
+                if not isinstance(value, str):
+                    continue
+                try:
+                    update[field] = parse_date(value)
+                except ValueError:
+                    unparseable.append({"collection": coll_name, "id": doc.get("id"), "field": field, "value": value})
+            if update:
+                ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": update}))
+                converted[coll_name] += 1
+            if len(ops) >= 500:
+                if not dry_run:
+                    await coll.bulk_write(ops, ordered=False)
+                ops = []
+        if ops and not dry_run:
+            await coll.bulk_write(ops, ordered=False)
+    
+    if not dry_run:
+        await rebuild_deadlines()
+    return {"dry_run": dry_run, "converted": converted, "unparseable": unparseable}
+
+@api_router.post("/admin/migrate-dates")
+async def admin_migrate_dates(dry_run: bool = False):
+    """Convert string date fields to native dates"""
+    return await migrate_date_fields(dry_run)
 
 # ----- Budget Templates -----
 BUDGET_TEMPLATES = {
@@ -872,7 +3436,7 @@ async def seed_demo_data():
             "fiscal_year_end": "June 30",
             "primary_contact": "Maria Rodriguez",
             "primary_email": "maria@communitybridges.org"
-        }},
+        }, "$inc": {"version": 1}},
         upsert=True
     )
     
@@ -925,7 +3489,7 @@ async def seed_demo_data():
         }
     ]
     for f in funders_data:
-        await db.funders.update_one({"name": f["name"]}, {"$set": f}, upsert=True)
+        await db.funders.update_one({"name": f["name"]}, {"$set": f, "$inc": {"version": 1}}, upsert=True)
     
     # Grants
     grant1_id = str(uuid.uuid4())
@@ -1000,7 +3564,8 @@ async def seed_demo_data():
         }
     ]
     for g in grants_data:
-        await db.grants.update_one({"id": g["id"]}, {"$set": g}, upsert=True)
+        await db.grants.update_one({"id": g["id"]}, {"$set": dates_to_db(g)}, upsert=True)
+    await rebuild_dashboard_summary()
     
     # Reporting Requirements for awarded grants
     reports_data = [
@@ -1012,7 +3577,7 @@ async def seed_demo_data():
         {"id": str(uuid.uuid4()), "grant_id": grant2_id, "report_type": "final", "title": "Final Report", "description": "Final narrative and financial report", "due_date": "2025-07-31", "frequency": "one-time", "status": "upcoming", "submitted_date": "", "notes": "Include photos and testimonials"}
     ]
     for r in reports_data:
-        await db.reporting.update_one({"id": r["id"]}, {"$set": r}, upsert=True)
+        await db.reporting.update_one({"id": r["id"]}, {"$set": dates_to_db(r)}, upsert=True)
     
     # Compliance Items
     compliance_data = [
@@ -1024,7 +3589,8 @@ async def seed_demo_data():
         {"id": str(uuid.uuid4()), "grant_id": grant2_id, "requirement": "Conduct pre/post surveys for all training participants", "category": "programmatic", "deadline": "", "is_completed": True, "notes": "Using SurveyMonkey"}
     ]
     for c in compliance_data:
-        await db.compliance.update_one({"id": c["id"]}, {"$set": c}, upsert=True)
+        await db.compliance.update_one({"id": c["id"]}, {"$set": dates_to_db(c)}, upsert=True)
+    await rebuild_deadlines()
     
     # Content Library
     content_data = [
@@ -1111,6 +3677,8 @@ async def seed_demo_data():
     ]
     for o in outcomes_data:
         await db.outcomes.update_one({"id": o["id"]}, {"$set": o}, upsert=True)
+    await rebuild_search_index()
+    await rebuild_funder_matcher()
     
     return {
         "message": "Demo data seeded successfully",
@@ -1134,8 +3702,12 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 @app.on_event("shutdown")
 async def shutdown():
+    await stop_job_workers()
+    if document_pool:
+        document_pool.shutdown(cancel_futures=True)
     client.close()
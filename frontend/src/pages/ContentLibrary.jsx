@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { getContent, createContent, updateContent, deleteContent, aiDraft } from '@/services/api';
+import { getContent, createContent, updateContent, deleteContent, streamAiDraft, isConflict } from '@/services/api';
 import { Plus, Search, Edit2, Trash2, Copy, Sparkles, Loader2, FolderOpen } from 'lucide-react';
 
 const CATEGORIES = [
@@ -44,10 +44,16 @@ export const ContentLibrary = () => {
       tags: form.tags.split(',').map(t => t.trim()).filter(Boolean)
     };
     
-    if (editing) {
-      await updateContent(editing.id, data);
-    } else {
-      await createContent(data);
+    try {
+      if (editing) {
+        await updateContent(editing.id, data, editing.version);
+      } else {
+        await createContent(data);
+      }
+    } catch (e) {
+      if (!isConflict(e)) throw e;
+      alert('This item was changed by someone else. Reload to see their changes, then edit again.');
+      return;
     }
     
     setShowModal(false);
@@ -83,8 +89,16 @@ export const ContentLibrary = () => {
     if (!aiPrompt) return;
     setAiLoading(true);
     try {
-      const res = await aiDraft({ prompt: aiPrompt, context: 'Organizational content for grant applications' });
-      setForm({ ...form, content: res.data.content });
+      let content = '';
+      setForm((f) => ({ ...f, content }));
+      const res = await streamAiDraft(
+        { prompt: aiPrompt, context: 'Organizational content for grant applications' },
+        (text) => {
+          content += text;
+          setForm((f) => ({ ...f, content }));
+        }
+      );
+      setForm((f) => ({ ...f, content: res.content }));
     } catch (e) {
       alert('AI drafting failed');
     } finally {
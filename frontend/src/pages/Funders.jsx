@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { getFunders, createFunder, updateFunder, deleteFunder } from '@/services/api';
+import { getFunders, createFunder, updateFunder, deleteFunder, isConflict } from '@/services/api';
 import { Plus, Search, Edit2, Trash2, ExternalLink, Building, Globe, User } from 'lucide-react';
 
 export const Funders = () => {
@@ -34,10 +34,16 @@ export const Funders = () => {
       application_requirements: form.application_requirements.split('\n').filter(Boolean)
     };
     
-    if (editing) {
-      await updateFunder(editing.id, data);
-    } else {
-      await createFunder(data);
+    try {
+      if (editing) {
+        await updateFunder(editing.id, data, editing.version);
+      } else {
+        await createFunder(data);
+      }
+    } catch (e) {
+      if (!isConflict(e)) throw e;
+      alert('This funder was changed by someone else. Reload to see their changes, then edit again.');
+      return;
     }
     
     setShowModal(false);
@@ -1,9 +1,9 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { useParams, useNavigate, Link } from 'react-router-dom';
 import { 
-  getGrant, updateGrant, deleteGrant,
-  getReporting, createReporting, updateReporting, deleteReporting,
-  getCompliance, createCompliance, updateCompliance, deleteCompliance,
+  getGrantBundle, updateGrant, deleteGrant,
+  createReporting, updateReporting, deleteReporting,
+  createCompliance, updateCompliance, deleteCompliance,
   extractAward
 } from '@/services/api';
 import { 
@@ -36,14 +36,10 @@ export const GrantDetail = () => {
 
   const loadData = async () => {
     try {
-      const [grantRes, reportsRes, compRes] = await Promise.all([
-        getGrant(id),
-        getReporting(id),
-        getCompliance(id)
-      ]);
-      setGrant(grantRes.data);
-      setReports(reportsRes.data || []);
-      setCompliance(compRes.data || []);
+      const { data } = await getGrantBundle(id);
+      setGrant(data.grant);
+      setReports(data.reports || []);
+      setCompliance(data.compliance || []);
     } catch (e) {
       navigate('/pipeline');
     } finally {
@@ -69,20 +65,9 @@ export const GrantDetail = () => {
 
     setExtracting(true);
     try {
-      const reader = new FileReader();
-      reader.onload = async (ev) => {
-        const base64 = ev.target.result;
-        const res = await extractAward({
-          grant_id: id,
-          base64_data: base64,
-          mime_type: file.type,
-          filename: file.name
-        });
-        
-        alert(`Extracted ${res.data.created_reports} reporting requirements and ${res.data.created_compliance} compliance items`);
-        loadData();
-      };
-      reader.readAsDataURL(file);
+      const res = await extractAward(id, file);
+      alert(`Extracted ${res.data.created_reports} reporting requirements and ${res.data.created_compliance} compliance items`);
+      loadData();
     } catch (e) {
       alert('Failed to extract: ' + e.message);
     } finally {
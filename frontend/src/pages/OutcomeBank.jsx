@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { getOutcomes, createOutcome, updateOutcome, deleteOutcome } from '@/services/api';
+import { getOutcomes, createOutcome, updateOutcome, deleteOutcome, isConflict } from '@/services/api';
 import { Plus, Search, Edit2, Trash2, Copy, BarChart3, Users, MessageSquare, TrendingUp } from 'lucide-react';
 
 const METRIC_TYPES = [
@@ -40,10 +40,16 @@ export const OutcomeBank = () => {
   const handleSave = async () => {
     if (!form.title || !form.value) return;
     
-    if (editing) {
-      await updateOutcome(editing.id, form);
-    } else {
-      await createOutcome(form);
+    try {
+      if (editing) {
+        await updateOutcome(editing.id, form, editing.version);
+      } else {
+        await createOutcome(form);
+      }
+    } catch (e) {
+      if (!isConflict(e)) throw e;
+      alert('This outcome was changed by someone else. Reload to see their changes, then edit again.');
+      return;
     }
     
     setShowModal(false);
@@ -3,25 +3,30 @@ import axios from 'axios';
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const api = axios.create({ baseURL: `${BACKEND_URL}/api` });
 
+// Sends the record's version so the server rejects the save (412) if someone else changed it since it was loaded
+const ifMatch = (version) => (version ? { headers: { 'If-Match': `"${version}"` } } : {});
+export const isConflict = (e) => e.response?.status === 412;
+
 // Dashboard
 export const getDashboard = () => api.get('/dashboard');
 
 // Content Library
 export const getContent = (category) => api.get('/content', { params: { category } });
 export const createContent = (data) => api.post('/content', data);
-export const updateContent = (id, data) => api.put(`/content/${id}`, data);
+export const updateContent = (id, data, version) => api.put(`/content/${id}`, data, ifMatch(version));
 export const deleteContent = (id) => api.delete(`/content/${id}`);
 
 // Funders
 export const getFunders = () => api.get('/funders');
 export const getFunder = (id) => api.get(`/funders/${id}`);
 export const createFunder = (data) => api.post('/funders', data);
-export const updateFunder = (id, data) => api.put(`/funders/${id}`, data);
+export const updateFunder = (id, data, version) => api.put(`/funders/${id}`, data, ifMatch(version));
 export const deleteFunder = (id) => api.delete(`/funders/${id}`);
 
 // Grants
 export const getGrants = (stage) => api.get('/grants', { params: { stage } });
 export const getGrant = (id) => api.get(`/grants/${id}`);
+export const getGrantBundle = (id) => api.get(`/grants/${id}/bundle`);
 export const createGrant = (data) => api.post('/grants', data);
 export const updateGrant = (id, data) => api.put(`/grants/${id}`, data);
 export const deleteGrant = (id) => api.delete(`/grants/${id}`);
@@ -51,7 +56,7 @@ export const getBudgetTemplate = (id) => api.get(`/budget-templates/${id}`);
 // Outcomes
 export const getOutcomes = (program) => api.get('/outcomes', { params: { program } });
 export const createOutcome = (data) => api.post('/outcomes', data);
-export const updateOutcome = (id, data) => api.put(`/outcomes/${id}`, data);
+export const updateOutcome = (id, data, version) => api.put(`/outcomes/${id}`, data, ifMatch(version));
 export const deleteOutcome = (id) => api.delete(`/outcomes/${id}`);
 
 // Settings
@@ -59,9 +64,43 @@ export const getSettings = () => api.get('/settings');
 export const updateSettings = (data) => api.put('/settings', data);
 
 // AI
-export const extractAward = (data) => api.post('/ai/extract-award', data);
+export const extractAward = (grantId, file) => {
+  const form = new FormData();
+  form.append('grant_id', grantId);
+  form.append('file', file);
+  return api.post('/ai/extract-award/upload', form);
+};
 export const aiDraft = (data) => api.post('/ai/draft', data);
 
+// Streams a draft over server-sent events, calling onToken with each piece of text; resolves with the final event
+export const streamAiDraft = async (data, onToken) => {
+  const res = await fetch(`${BACKEND_URL}/api/ai/draft/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(data),
+  });
+  if (!res.ok) throw new Error(`AI drafting failed (${res.status})`);
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) >= 0) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      const event = block.match(/^event: (.*)$/m)?.[1];
+      const payload = JSON.parse(block.match(/^data: (.*)$/m)?.[1] || '{}');
+      if (event === 'token') onToken(payload.text);
+      if (event === 'error') throw new Error(payload.detail);
+      if (event === 'done') return payload;
+    }
+  }
+  throw new Error('AI drafting stream ended early');
+};
+
 // Calendar
 export const getCalendarEvents = () => api.get('/calendar/export');
 
@@ -69,5 +108,7 @@ export const getCalendarEvents = () => api.get('/calendar/export');
 export const exportData = () => api.get('/export');
 export const importData = (data) => api.post('/import', data);
 export const seedDemoData = () => api.post('/seed-demo');
+// operations: [{ op: 'create'|'update'|'delete', collection, id, data, if_match }]
+export const runBatch = (operations) => api.post('/batch', { operations });
 
 export default api;
@@ -0,0 +1,34 @@
+"""Unit checks for parsing funder award ranges into numeric bounds."""
+import math
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+server = pytest.importorskip("server")
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("$10,000 - $50,000", (10000, 50000)),
+    ("$25K-$100K", (25000, 100000)),
+    ("Up to $1M", (0, 1000000)),
+    ("Maximum award $75,000", (0, 75000)),
+    ("no more than $20k", (0, 20000)),
+    ("$500,000+", (500000, math.inf)),
+    ("At least $5,000", (5000, math.inf)),
+    ("Minimum request $2,500", (2500, math.inf)),
+    ("$40,000", (40000, 40000)),
+    ("Grants cover $25,000 per year", (25000, 25000)),
+    ("$5,000 to government agencies", (5000, 5000)),
+    ("$15,000 including administration costs", (15000, 15000)),
+    ("Awards of $30,000 since 2019", (30000, 30000)),
+])
+def test_parse_award_range(text, expected):
+    assert server.parse_award_range(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", None, "Varies", "Founded in 1998"])
+def test_parse_award_range_unknown(text):
+    low, high = server.parse_award_range(text)
+    assert math.isnan(low) and math.isnan(high)
@@ -0,0 +1,116 @@
+"""Check that every supported /api/grants query shape is served from an index without a blocking sort.
+
+The declared index specs are checked directly; the query plans need a reachable MongoDB
+(MONGO_URL from backend/.env) and are skipped otherwise.
+"""
+import asyncio
+import itertools
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+server = pytest.importorskip("server")
+
+TEST_DB = "grantpilot_test_indexes"
+
+FILTER_SHAPES = {
+    "none": {},
+    "stage": {"stages": ["writing"]},
+    "stages": {"stages": ["researching", "writing", "submitted"]},
+    "funder": {"funder_id": "funder-1"},
+    "program": {"program": "Youth Health"},
+    "deadline_range": {"deadline_from": datetime(2025, 1, 1), "deadline_to": datetime(2025, 6, 30)},
+    "amount_range": {"min_amount": 10000, "max_amount": 100000},
+    "stage_and_deadline_range": {"stages": ["writing"], "deadline_from": datetime(2025, 1, 1)},
+    "stage_and_amount_range": {"stages": ["pending", "awarded"], "min_amount": 50000},
+}
+
+
+def winning_stages(plan):
+    """Flatten the stage names of a (possibly nested) query plan"""
+    stages = [plan.get("stage")]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages += winning_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        stages += winning_stages(child)
+    return [s for s in stages if s]
+
+
+# Equality filters the grant list supports; each must lead an index for every sort
+EQUALITY_FIELDS = [None, "stage", "funder_id", "program"]
+
+
+def index_keys(model):
+    return list(model.document["key"].items())
+
+
+@pytest.mark.parametrize("field,sort", itertools.product(EQUALITY_FIELDS, server.GRANT_SORTS))
+def test_grant_sort_has_index(field, sort):
+    """Equality field, sort key and _id tie-breaker prefix some index, scanned forwards or backwards"""
+    wanted = ([(field, 1)] if field else []) + server.page_sort(server.GRANT_SORTS[sort])
+    if wanted == [("_id", 1)]:
+        return  # served by the default _id index
+    flipped = [(key, -direction) for key, direction in wanted]
+    prefixes = [index_keys(model)[:len(wanted)] for model in server.INDEXES["grants"]]
+    if field:
+        # Equality keys can be scanned in either direction
+        prefixes += [[(key, -d) if key == field else (key, d) for key, d in prefix] for prefix in prefixes]
+    assert wanted in prefixes or flipped in prefixes, f"no index for {field}/{sort}"
+
+
+@pytest.fixture(scope="module")
+def test_db():
+    loop = asyncio.new_event_loop()
+    patch = pytest.MonkeyPatch()
+
+    async def setup():
+        client = server.AsyncIOMotorClient(server.mongo_url, serverSelectionTimeoutMS=2000)
+        await client.admin.command("ping")
+        db = client[TEST_DB]
+        patch.setattr(server, "db", db)
+        await db.grants.drop()
+        await server.create_indexes()
+        await db.grants.insert_many([
+            server.Grant(
+                title=f"Grant {i}",
+                funder_id=f"funder-{i % 5}",
+                program=["Youth Health", "Mental Health", "Workforce"][i % 3],
+                stage=server.GRANT_STAGES[i % len(server.GRANT_STAGES)],
+                amount_requested=1000 * i,
+                deadline=datetime(2025, 1 + i % 12, 1 + i % 28),
+            ).model_dump()
+            for i in range(300)
+        ])
+        return client, db
+
+    try:
+        client, db = loop.run_until_complete(setup())
+    except Exception as e:
+        patch.undo()
+        loop.close()
+        pytest.skip(f"MongoDB not available: {e}")
+    yield loop, db
+    loop.run_until_complete(client.drop_database(TEST_DB))
+    client.close()
+    loop.close()
+    patch.undo()
+
+
+@pytest.mark.parametrize("shape,sort", itertools.product(FILTER_SHAPES, server.GRANT_SORTS))
+def test_grant_query_uses_index(test_db, shape, sort):
+    loop, db = test_db
+    query = server.grant_filter(**FILTER_SHAPES[shape])
+    sort_spec = server.page_sort(server.GRANT_SORTS[sort])
+
+    async def explain():
+        return await db.grants.find(query).sort(sort_spec).limit(51).explain()
+
+    plan = loop.run_until_complete(explain())["queryPlanner"]["winningPlan"]
+    stages = winning_stages(plan)
+    assert "COLLSCAN" not in stages, f"{shape}/{sort} plan: {stages}"
+    assert "SORT" not in stages, f"{shape}/{sort} needs a blocking sort: {stages}"
+    assert any(s in ("IXSCAN", "EXPRESS_IXSCAN") for s in stages), f"{shape}/{sort} plan: {stages}"